@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 from enum import Enum
 
-from graphiti_memory import get_shared_memory, MemoryStatus
+from graphiti_memory import AsyncSingleton, get_shared_memory, MemoryStatus
 from memory_models import (
     MetadataFactory,
     TDDCycleMetadata,
@@ -534,15 +534,9 @@ class PatternCapture:
 
 
 # Singleton instance
-_capture_instance = None
+_pattern_capture = AsyncSingleton(PatternCapture)
 
 
 async def get_pattern_capture() -> PatternCapture:
     """Get or create singleton PatternCapture instance"""
-    global _capture_instance
-
-    if _capture_instance is None:
-        _capture_instance = PatternCapture()
-        await _capture_instance.initialize()
-
-    return _capture_instance
+    return await _pattern_capture.get()
@@ -11,7 +11,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
-from graphiti_memory import get_shared_memory
+from graphiti_memory import AsyncSingleton, get_shared_memory
 from capture import get_pattern_capture, PatternType
 
 logger = logging.getLogger(__name__)
@@ -573,15 +573,9 @@ All commands access the shared knowledge graph: `{}`
 
 
 # Singleton instance
-_generator_instance = None
+_command_generator = AsyncSingleton(CommandGenerator)
 
 
 async def get_command_generator() -> CommandGenerator:
     """Get or create singleton CommandGenerator instance"""
-    global _generator_instance
-
-    if _generator_instance is None:
-        _generator_instance = CommandGenerator()
-        await _generator_instance.initialize()
-
-    return _generator_instance
+    return await _command_generator.get()
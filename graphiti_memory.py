@@ -48,6 +48,15 @@ class MemoryStatus(Enum):
     DEPRECATED = "deprecated"
 
 
+# Score multiplier per memory status, applied by search_with_temporal_weight
+STATUS_WEIGHTS = {
+    MemoryStatus.ACTIVE.value: 1.0,
+    MemoryStatus.SUPERSEDED.value: 0.3,
+    MemoryStatus.HISTORICAL.value: 0.1,
+    MemoryStatus.DEPRECATED.value: 0.0,
+}
+
+
 class SearchResultWrapper:
     """
     Wrapper for Graphiti search results to provide consistent interface
@@ -734,6 +743,62 @@ class SharedMemory:
             logger.error(f"Failed to verify group_id propagation: {e}")
             return False
 
+    async def count_memories(self) -> int:
+        """
+        Count memories stored in the shared group with a server-side aggregate.
+
+        Returns:
+            Number of episodes in the group (buffered episodes not yet flushed
+            are not included)
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        records, _, _ = await self.client.driver.execute_query(
+            """
+            MATCH (e:Episodic {group_id: $group_id})
+            RETURN count(e) AS total
+            """,
+            group_id=self.group_id,
+            routing_="r",
+        )
+        return records[0]["total"] if records else 0
+
+    async def scan_episodes(
+        self, limit: int = 1000, created_before: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List the group's episodes straight from Neo4j, newest first.
+
+        Used for whole-group passes, where a "*" search would embed a
+        meaningless query and rank hybrid-search hits instead of episodes.
+
+        Args:
+            limit: Maximum episodes to return
+            created_before: Only list episodes created before this time, so
+                age-based passes aren't crowded out by newer episodes
+
+        Returns:
+            Records with the episode ``uuid`` and raw JSON ``content``
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        records, _, _ = await self.client.driver.execute_query(
+            """
+            MATCH (e:Episodic {group_id: $group_id})
+            WHERE $cutoff IS NULL OR e.created_at < $cutoff
+            RETURN e.uuid AS uuid, e.content AS content
+            ORDER BY e.created_at DESC
+            LIMIT $limit
+            """,
+            group_id=self.group_id,
+            cutoff=created_before,
+            limit=limit,
+            routing_="r",
+        )
+        return records
+
     def _detect_cross_references(self, content: dict) -> List[str]:
         """Detect connections between GTD and coding domains"""
         refs = []
@@ -819,7 +884,12 @@ class SharedMemory:
         )
 
     async def search_with_temporal_weight(
-        self, query: str, include_historical: bool = None, filter_source: str = None
+        self,
+        query: str,
+        include_historical: bool = None,
+        filter_source: str = None,
+        limit: Optional[int] = None,
+        min_score: Optional[float] = None,
     ) -> List[Any]:
         """
         Search with temporal weighting and status awareness
@@ -828,6 +898,9 @@ class SharedMemory:
             query: Search query
             include_historical: Include historical memories
             filter_source: Filter by source (claude_code, gtd_coach, etc.)
+            limit: Maximum results to return (default 10)
+            min_score: Drop results whose weighted score falls below this.
+                Scores run 0-1: search rank, scaled down by age and status
 
         Returns:
             Weighted and filtered search results
@@ -841,12 +914,17 @@ class SharedMemory:
         # Escape query for safe Neo4j/Cypher search
         safe_query = self._escape_for_search(query)
 
+        # Get more than needed, since status/source filtering and weighting
+        # happen here after the search - a large limit raises the fetch too
+        top_k = 10 if limit is None else limit
+        num_results = max(30, top_k * 3)
+
         # Search in shared group
         try:
             results = await self.client.search(
                 safe_query,
                 group_ids=[self.group_id],
-                num_results=30,  # Get more, then filter and weight
+                num_results=num_results,
             )
         except Exception as e:
             logger.error(
@@ -857,7 +935,9 @@ class SharedMemory:
                 logger.info("Retrying with simplified query...")
                 simplified_query = re.sub(r"[^a-zA-Z0-9\s]", " ", query)
                 results = await self.client.search(
-                    simplified_query, group_ids=[self.group_id], num_results=30
+                    simplified_query,
+                    group_ids=[self.group_id],
+                    num_results=num_results,
                 )
             else:
                 raise
@@ -865,7 +945,7 @@ class SharedMemory:
         now = datetime.now(timezone.utc)
         weighted_results = []
 
-        for result in results:
+        for rank, result in enumerate(results):
             # Parse result metadata
             try:
                 if hasattr(result, "episode_body"):
@@ -875,27 +955,9 @@ class SharedMemory:
             except:
                 metadata = {}
 
-            # Apply temporal weighting
-            if "timestamp" in metadata:
-                created_at = datetime.fromisoformat(
-                    metadata["timestamp"].replace("Z", "+00:00")
-                )
-                age_days = (now - created_at).days
-                temporal_weight = self.decay_factor**age_days
-            else:
-                temporal_weight = 0.5
-
-            # Apply status weighting
+            # Filter by status and source first - skipped results never need
+            # their timestamp parsed
             status = metadata.get("status", MemoryStatus.ACTIVE.value)
-            status_weights = {
-                MemoryStatus.ACTIVE.value: 1.0,
-                MemoryStatus.SUPERSEDED.value: 0.3,
-                MemoryStatus.HISTORICAL.value: 0.1,
-                MemoryStatus.DEPRECATED.value: 0.0,
-            }
-            status_weight = status_weights.get(status, 0.5)
-
-            # Filter by status
             if status == MemoryStatus.DEPRECATED.value:
                 continue
             if not include_historical and status == MemoryStatus.HISTORICAL.value:
@@ -905,9 +967,34 @@ class SharedMemory:
             if filter_source and metadata.get("source") != filter_source:
                 continue
 
-            # Calculate final score
-            base_score = getattr(result, "score", 0.5)
+            # Apply temporal weighting - graph edges carry no episode body,
+            # so fall back to the edge's own creation time
+            if "timestamp" in metadata:
+                created_at = datetime.fromisoformat(
+                    metadata["timestamp"].replace("Z", "+00:00")
+                )
+            else:
+                created_at = getattr(result, "created_at", None)
+            if isinstance(created_at, datetime):
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                age_days = (now - created_at).days
+                temporal_weight = self.decay_factor**age_days
+            else:
+                temporal_weight = 0.5
+
+            # Apply status weighting
+            status_weight = STATUS_WEIGHTS.get(status, 0.5)
+
+            # Calculate final score. Graphiti returns edges in reranked order
+            # without a score, so relevance comes from the rank: 1.0 for the
+            # best hit down to 1/len(results) for the last
+            base_score = getattr(result, "score", None)
+            if not isinstance(base_score, (int, float)):
+                base_score = 1 - rank / len(results)
             final_score = base_score * temporal_weight * status_weight
+            if min_score is not None and final_score < min_score:
+                continue
 
             # Add to results - store computed values in a way that doesn't modify the object
             # Create a wrapper dict to avoid modifying the original object
@@ -923,9 +1010,10 @@ class SharedMemory:
         weighted_results.sort(key=lambda x: x["final_score"], reverse=True)
 
         # Wrap results in SearchResultWrapper objects with computed metadata
-        # Return just the top 10 results
+        # Return just the top_k results - saves wrapping and token-counting
+        # results that get dropped
         final_results = []
-        for wrapper in weighted_results[:10]:  # Get top 10
+        for wrapper in weighted_results[:top_k]:
             result = wrapper["result"]
             # Wrap in SearchResultWrapper with computed metadata and score
             wrapped_result = SearchResultWrapper(
@@ -1278,15 +1366,18 @@ class SharedMemory:
 
         # 1. Mark old memories as historical
         now = datetime.now(timezone.utc)
-        all_memories = await self.client.search(
-            "*", group_ids=[self.group_id], num_results=1000  # Get all memories
+        # Scan episodes directly - no embedding or similarity search needed.
+        # Only episodes past the 30-day cutoff can be marked, so filter on it
+        # in the query rather than scanning the newest episodes
+        all_memories = await self.scan_episodes(
+            limit=1000, created_before=now - timedelta(days=30)
         )
 
         historical_count = 0
         for memory in all_memories:
-            if hasattr(memory, "episode_body"):
+            if memory["content"]:
                 try:
-                    metadata = json.loads(memory.episode_body)
+                    metadata = json.loads(memory["content"])
                     if "timestamp" in metadata:
                         created_at = datetime.fromisoformat(
                             metadata["timestamp"].replace("Z", "+00:00")
@@ -1297,9 +1388,7 @@ class SharedMemory:
                             age_days > 30
                             and metadata.get("status") == MemoryStatus.ACTIVE.value
                         ):
-                            await self.mark_historical(
-                                getattr(memory, "id", "unknown"), age_days
-                            )
+                            await self.mark_historical(memory["uuid"], age_days)
                             historical_count += 1
                 except Exception as e:
                     logger.error(f"Failed to process memory for optimization: {e}")
@@ -1339,16 +1428,43 @@ class SharedMemory:
             self.episode_buffer = []  # Clear any remaining buffer
 
 
+class AsyncSingleton:
+    """Lazily build one initialized instance of a component class
+
+    Concurrent first callers all await a single build task, and the instance
+    is only published once initialize() has finished; a failed build is
+    retried on the next call. No asyncio.Lock is created at import time, as
+    on Python 3.9 it would bind to whichever loop existed then.
+    """
+
+    def __init__(self, cls):
+        self._cls = cls
+        self.instance = None
+        self._building: Optional[asyncio.Task] = None
+
+    async def get(self):
+        if self.instance is None:
+            loop = asyncio.get_running_loop()
+            task = self._building
+            if task is None or task.get_loop() is not loop:
+                task = self._building = loop.create_task(self._build())
+            # Shielded so one caller going away doesn't cancel the shared build
+            await asyncio.shield(task)
+        return self.instance
+
+    async def _build(self) -> None:
+        try:
+            instance = self._cls()
+            await instance.initialize()
+            self.instance = instance
+        finally:
+            self._building = None
+
+
 # Singleton instance
-_shared_memory_instance = None
+_shared_memory = AsyncSingleton(SharedMemory)
 
 
 async def get_shared_memory() -> SharedMemory:
     """Get or create the singleton SharedMemory instance"""
-    global _shared_memory_instance
-
-    if _shared_memory_instance is None:
-        _shared_memory_instance = SharedMemory()
-        await _shared_memory_instance.initialize()
-
-    return _shared_memory_instance
+    return await _shared_memory.get()
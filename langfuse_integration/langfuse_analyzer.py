@@ -37,7 +37,7 @@ except ImportError:
 
 from langfuse import Langfuse
 from .langfuse_patterns import PatternDetector
-from graphiti_memory import get_shared_memory
+from graphiti_memory import AsyncSingleton, get_shared_memory
 
 # Import SSL configuration
 try:
@@ -107,6 +107,15 @@ class LangfuseAnalyzer:
             self._initialized = True
             logger.info("LangfuseAnalyzer initialized with shared memory")
 
+    @staticmethod
+    def _next_page(response, page: int) -> Optional[int]:
+        """Next page number from a paginated trace listing, or None if last"""
+        meta = getattr(response, "meta", None)
+        total_pages = getattr(meta, "total_pages", None)
+        if not isinstance(total_pages, int) or page >= total_pages:
+            return None
+        return page + 1
+
     def _should_skip_trace(self, trace) -> bool:
         """
         Check if a trace should be skipped to prevent analysis loops.
@@ -132,6 +141,8 @@ class LangfuseAnalyzer:
         hours_back: int = 1,
         session_id: Optional[str] = None,
         project: Optional[str] = None,
+        limit: int = 50,
+        page: int = 1,
     ) -> Dict[str, Any]:
         """
         Analyze recent Langfuse traces and detect patterns
@@ -140,19 +151,26 @@ class LangfuseAnalyzer:
             hours_back: How many hours back to look
             session_id: Optional specific session to analyze
             project: Optional project name for filtering
+            limit: Maximum traces to fetch for this page
+            page: Page of the trace window to analyze (1-based)
 
         Returns:
-            Analysis results with detected patterns
+            Analysis results with detected patterns and the next page, if any
         """
         if not self.client:
             return {"error": "Langfuse client not configured"}
 
-        # Get recent traces
+        # Get one page of recent traces
         from_timestamp = datetime.now() - timedelta(hours=hours_back)
 
-        traces = self.client.api.trace.list(
-            from_timestamp=from_timestamp, session_id=session_id, limit=50
-        ).data
+        response = self.client.api.trace.list(
+            from_timestamp=from_timestamp,
+            session_id=session_id,
+            limit=limit,
+            page=page,
+        )
+        traces = response.data
+        next_page = self._next_page(response, page)
 
         if not traces:
             return {
@@ -160,6 +178,8 @@ class LangfuseAnalyzer:
                 "message": "No traces found",
                 "traces": [],
                 "patterns": [],
+                "page": page,
+                "next_page": None,
             }
 
         # Filter out MCP-internal traces to prevent analysis loops
@@ -244,8 +264,45 @@ class LangfuseAnalyzer:
             "traces": analysis_results,
             "patterns_detected": len(detected_patterns),
             "unique_patterns": len(set(p["signature"] for p in detected_patterns)),
+            "page": page,
+            "next_page": next_page,
         }
 
+    async def poll_recent_traces(
+        self, since: datetime, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Lightweight listing of traces started after `since`
+
+        Unlike analyze_recent_traces this skips observation/score fetches and
+        does not store patterns, so it is safe to call from a polling loop.
+
+        Args:
+            since: Only return traces with a timestamp after this time
+            limit: Maximum traces to fetch
+
+        Returns:
+            Summaries of non-MCP traces (id, name, session_id, timestamp)
+        """
+        if not self.client:
+            return []
+
+        # The Langfuse API client is synchronous - keep it off the event loop
+        response = await asyncio.to_thread(
+            self.client.api.trace.list, from_timestamp=since, limit=limit
+        )
+
+        return [
+            {
+                "trace_id": trace.id,
+                "name": trace.name,
+                "session_id": trace.session_id,
+                "timestamp": trace.timestamp.isoformat() if trace.timestamp else None,
+            }
+            for trace in response.data
+            if not self._should_skip_trace(trace)
+        ]
+
     async def analyze_phase_transitions(
         self, trace_id: Optional[str] = None, session_id: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -477,7 +534,11 @@ class LangfuseAnalyzer:
         return analysis
 
     async def detect_interrupt_patterns(
-        self, hours_back: int = 1, session_id: Optional[str] = None
+        self,
+        hours_back: int = 1,
+        session_id: Optional[str] = None,
+        limit: int = 50,
+        page: int = 1,
     ) -> Dict[str, Any]:
         """
         Detect interrupt patterns in traces
@@ -485,18 +546,24 @@ class LangfuseAnalyzer:
         Args:
             hours_back: Hours to look back
             session_id: Optional specific session
+            limit: Maximum traces to fetch for this page
+            page: Page of the trace window to scan (1-based)
 
         Returns:
-            Interrupt pattern analysis
+            Interrupt pattern analysis and the next page, if any
         """
         if not self.client:
             return {"error": "Langfuse client not configured"}
 
         from_timestamp = datetime.now() - timedelta(hours=hours_back)
 
-        traces = self.client.api.trace.list(
-            from_timestamp=from_timestamp, session_id=session_id, limit=50
-        ).data
+        response = self.client.api.trace.list(
+            from_timestamp=from_timestamp,
+            session_id=session_id,
+            limit=limit,
+            page=page,
+        )
+        traces = response.data
 
         interrupt_patterns = []
 
@@ -541,6 +608,8 @@ class LangfuseAnalyzer:
             "traces_analyzed": len(traces),
             "interrupts_found": len(interrupt_patterns),
             "patterns": interrupt_patterns,
+            "page": page,
+            "next_page": self._next_page(response, page),
         }
 
     async def predict_trace_issues(
@@ -828,13 +897,9 @@ class LangfuseAnalyzer:
 
 
 # Singleton instance
-_analyzer_instance = None
+_langfuse_analyzer = AsyncSingleton(LangfuseAnalyzer)
 
 
 async def get_langfuse_analyzer() -> LangfuseAnalyzer:
     """Get or create singleton LangfuseAnalyzer instance"""
-    global _analyzer_instance
-    if _analyzer_instance is None:
-        _analyzer_instance = LangfuseAnalyzer()
-        await _analyzer_instance.initialize()
-    return _analyzer_instance
+    return await _langfuse_analyzer.get()
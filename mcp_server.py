@@ -5,28 +5,58 @@ Provides endpoints for memory operations with GTD integration
 """
 
 import asyncio
+import atexit
+import base64
+import functools
+import heapq
+import io
 import json
 import logging
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-
-from mcp.server import Server
+import random
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+from urllib.parse import urlsplit
+
+import mcp.server.stdio
+from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 from mcp.types import Resource, Tool, TextContent, ImageContent, EmbeddedResource
+from graphiti_core.errors import GraphitiError
+from neo4j.exceptions import (
+    DriverError,
+    Neo4jError,
+    ServiceUnavailable,
+    SessionExpired,
+    TransientError,
+)
 
 from graphiti_memory import get_shared_memory, MemoryStatus
 from capture import get_pattern_capture, PatternType
 from commands import get_command_generator
-from langfuse_integration.langfuse_analyzer import get_langfuse_analyzer
 from secrets_manager import SecretsManager
 
+# orjson is optional - C-backed encoding for tool results, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging first
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Import Langfuse - MANDATORY for observability
-from langfuse import Langfuse, get_client
+# Langfuse is MANDATORY for observability, but the SDK and the trace analyzer
+# are imported on first use so module import stays cheap
 
 # Lazy initialization for Langfuse client
 _langfuse_client = None
@@ -34,6 +64,29 @@ _langfuse_initialized = False
 LANGFUSE_ENABLED = False
 
 
+# LANGFUSE_HOST may be configured with or without a scheme
+_SCHEME_RE = re.compile(r"^https?://")
+
+
+@functools.lru_cache(maxsize=4)
+def _strip_scheme(host: str) -> str:
+    """Host without a leading http:// or https://"""
+    return _SCHEME_RE.sub("", host, count=1)
+
+
+@functools.lru_cache(maxsize=4)
+def _ensure_scheme(host: str) -> str:
+    """Host with http:// prepended unless it already has http(s)://"""
+    return host if _SCHEME_RE.match(host) else f"http://{host}"
+
+
+@functools.lru_cache(maxsize=1)
+def _otel_auth_header(public_key: str, secret_key: str) -> str:
+    """OTEL exporter header: Basic Auth with public_key:secret_key"""
+    token = base64.b64encode(f"{public_key}:{secret_key}".encode("ascii"))
+    return f"Authorization=Basic {token.decode('ascii')}"
+
+
 async def get_langfuse_client():
     """Get or initialize the Langfuse client lazily.
 
@@ -59,10 +112,12 @@ async def get_langfuse_client():
         raise ValueError(error_msg)
 
     try:
+        from langfuse import Langfuse, get_client
+
         # Initialize the Langfuse singleton with credentials (v3 pattern)
         if not _langfuse_initialized:
             # Use ssl_config to properly handle OrbStack certificates
-            from ssl_config import get_ssl_config
+            from ssl_config import create_langfuse_httpx_client, get_ssl_config
 
             ssl_config = get_ssl_config()
             ssl_info = ssl_config.get_info()
@@ -72,19 +127,17 @@ async def get_langfuse_client():
             logger.info("Configuring OTLP endpoint to use HTTP (avoids SSL issues)")
 
             # Get the base host without protocol
-            langfuse_host_for_otel = os.environ.get("LANGFUSE_HOST", "langfuse.local")
-            # Remove any existing protocol prefix
-            if langfuse_host_for_otel.startswith("http://"):
-                langfuse_host_for_otel = langfuse_host_for_otel[7:]
-            elif langfuse_host_for_otel.startswith("https://"):
-                langfuse_host_for_otel = langfuse_host_for_otel[8:]
+            langfuse_host_for_otel = _strip_scheme(
+                os.environ.get("LANGFUSE_HOST", "langfuse.local")
+            )
 
             # Use HTTP for OTLP endpoint to avoid SSL verification issues
             os.environ["OTEL_EXPORTER_OTLP_ENDPOINT"] = (
                 f"http://{langfuse_host_for_otel}/api/public/otel"
             )
             logger.info(
-                f"OTLP endpoint set to: http://{langfuse_host_for_otel}/api/public/otel"
+                "OTLP endpoint set to: http://%s/api/public/otel",
+                langfuse_host_for_otel,
             )
 
             # If OrbStack cert is found, still use it for main API calls
@@ -94,7 +147,8 @@ async def get_langfuse_client():
 
             if ssl_info.get("is_orbstack") and ssl_info.get("cert_path"):
                 logger.info(
-                    f"Using OrbStack certificate for main API: {ssl_info['cert_path']}"
+                    "Using OrbStack certificate for main API: %s",
+                    ssl_info["cert_path"],
                 )
                 # Temporarily set environment variables for Langfuse initialization
                 os.environ["REQUESTS_CA_BUNDLE"] = ssl_info["cert_path"]
@@ -105,25 +159,23 @@ async def get_langfuse_client():
                 )
 
             # Configure OTEL authentication headers for Langfuse
-            # The OTEL exporter needs Basic Auth with public_key as username and secret_key as password
-            import base64
-
-            auth_string = f"{LANGFUSE_PUBLIC_KEY}:{LANGFUSE_SECRET_KEY}"
-            auth_bytes = auth_string.encode("ascii")
-            auth_b64 = base64.b64encode(auth_bytes).decode("ascii")
-            os.environ["OTEL_EXPORTER_OTLP_HEADERS"] = f"Authorization=Basic {auth_b64}"
+            os.environ["OTEL_EXPORTER_OTLP_HEADERS"] = _otel_auth_header(
+                LANGFUSE_PUBLIC_KEY, LANGFUSE_SECRET_KEY
+            )
             logger.info("Configured OTEL authentication headers")
 
             # Use environment variable for host if available, otherwise default
-            langfuse_host = os.environ.get("LANGFUSE_HOST", "langfuse.local")
-            # Ensure host has http:// prefix if not present
-            if not langfuse_host.startswith(("http://", "http://")):
-                langfuse_host = f"http://{langfuse_host}"
+            # (http:// is assumed when no scheme is given; https:// is kept)
+            langfuse_host = _ensure_scheme(
+                os.environ.get("LANGFUSE_HOST", "langfuse.local")
+            )
 
             Langfuse(
                 public_key=LANGFUSE_PUBLIC_KEY,
                 secret_key=LANGFUSE_SECRET_KEY,
                 host=langfuse_host,  # Use dynamic host from env
+                # Same pooled client (and SSL context) as the trace analyzer
+                httpx_client=create_langfuse_httpx_client(),
             )
             _langfuse_initialized = True
 
@@ -154,8 +206,178 @@ async def get_langfuse_client():
         raise ValueError(error_msg)
 
 
+# When the Langfuse host doesn't accept connections, tool calls skip span
+# creation (each span would otherwise wait out the exporter's timeout) until
+# a background re-probe succeeds
+_LANGFUSE_PROBE_TIMEOUT = 0.5
+_LANGFUSE_REPROBE_INTERVAL = 60.0
+_langfuse_reachable = True
+_langfuse_reprobe_task: Optional[asyncio.Task] = None
+
+
+async def _probe_langfuse() -> bool:
+    """TCP-connect to LANGFUSE_HOST with a short timeout"""
+    parts = urlsplit(_ensure_scheme(os.environ.get("LANGFUSE_HOST", "langfuse.local")))
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port),
+            timeout=_LANGFUSE_PROBE_TIMEOUT,
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def _reprobe_langfuse():
+    """Re-probe an unreachable Langfuse host until it answers"""
+    global _langfuse_reachable
+    while not _langfuse_reachable:
+        await asyncio.sleep(_LANGFUSE_REPROBE_INTERVAL)
+        if await _probe_langfuse():
+            _langfuse_reachable = True
+            logger.info("Langfuse reachable again, resuming tool-call tracing")
+
+
+async def _check_langfuse_reachable() -> bool:
+    """Probe Langfuse once; if it is down, pause tracing and start re-probing"""
+    global _langfuse_reachable, _langfuse_reprobe_task
+    _langfuse_reachable = await _probe_langfuse()
+    if not _langfuse_reachable:
+        logger.warning(
+            "Langfuse unreachable, tool-call tracing paused (re-probing every %.0fs)",
+            _LANGFUSE_REPROBE_INTERVAL,
+        )
+        if _langfuse_reprobe_task is None or _langfuse_reprobe_task.done():
+            _langfuse_reprobe_task = asyncio.create_task(_reprobe_langfuse())
+    return _langfuse_reachable
+
+
+# Shared memory, pattern capture and command generator bound by main(), so
+# request handlers read them directly instead of awaiting the getters
+_memory = None
+_capture = None
+_generator = None
+
+# Trace analyzer cached at startup so tool calls read it without awaiting
+_langfuse_analyzer = None
+
+# debug_session from analyze_langfuse_traces, resolved once with the analyzer
+# (stays None if the module cannot be imported)
+_debug_session = None
+
+
+async def get_langfuse_analyzer():
+    """Get the Langfuse trace analyzer, importing its module on first use"""
+    global _langfuse_analyzer, _debug_session
+
+    if _langfuse_analyzer is None:
+        from langfuse_integration.langfuse_analyzer import (
+            get_langfuse_analyzer as _get_langfuse_analyzer,
+        )
+
+        try:
+            from langfuse_integration.analyze_langfuse_traces import (
+                debug_session as _debug_session,
+            )
+        except ImportError:
+            _debug_session = None
+
+        # No lock here: the analyzer module builds its singleton once, so
+        # concurrent first calls all get the same instance
+        _langfuse_analyzer = await _get_langfuse_analyzer()
+    return _langfuse_analyzer
+
+
+# Terminal trace updates (output serialization + span end) are handed off to a
+# background worker so tool latency never depends on Langfuse responsiveness
+_TRACE_QUEUE_MAXSIZE = 1024
+_TRACE_BATCH_SIZE = 64
+_TRACE_BATCH_WAIT = 0.05  # seconds to wait for a batch to fill
+_trace_queue: Optional[asyncio.Queue] = None
+_trace_worker_task: Optional[asyncio.Task] = None
+
+
+def _finish_root_span(
+    span, trace_attrs: Dict[str, Any], output: Dict[str, Any], end_time: int
+) -> None:
+    """Apply the single terminal trace update and end the root span"""
+    span.update_trace(output=output, **trace_attrs)
+    span.end(end_time=end_time)
+
+
+def _enqueue_trace_update(
+    span, output: Dict[str, Any], trace_attrs: Optional[Dict[str, Any]] = None
+) -> None:
+    """Queue the terminal update for a root span, finishing inline if needed"""
+    end_time = time.time_ns()
+    trace_attrs = trace_attrs or {}
+    if _trace_queue is not None:
+        try:
+            _trace_queue.put_nowait((span, trace_attrs, output, end_time))
+            return
+        except asyncio.QueueFull:
+            logger.warning("Trace queue full - finishing span inline")
+    _finish_root_span(span, trace_attrs, output, end_time)
+
+
+async def _next_trace_batch() -> List[tuple]:
+    """Wait for one queued update, then gather more for a short window"""
+    loop = asyncio.get_running_loop()
+    batch = [await _trace_queue.get()]
+    deadline = loop.time() + _TRACE_BATCH_WAIT
+    while len(batch) < _TRACE_BATCH_SIZE:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_trace_queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def _trace_worker() -> None:
+    """Drain queued trace updates off the request path in small batches"""
+    while True:
+        batch = await _next_trace_batch()
+        for span, trace_attrs, output, end_time in batch:
+            try:
+                _finish_root_span(span, trace_attrs, output, end_time)
+            except Exception as e:
+                logger.debug("Failed to finish trace span: %s", e)
+            finally:
+                _trace_queue.task_done()
+
+
+def _start_trace_worker() -> None:
+    """Create the trace queue and start its worker on the running loop"""
+    global _trace_queue, _trace_worker_task
+    if _trace_worker_task is None:
+        _trace_queue = asyncio.Queue(maxsize=_TRACE_QUEUE_MAXSIZE)
+        _trace_worker_task = asyncio.create_task(_trace_worker())
+
+
+async def _stop_trace_worker(timeout: float = 5.0) -> None:
+    """Flush pending trace updates and stop the worker"""
+    global _trace_queue, _trace_worker_task
+    if _trace_worker_task is None:
+        return
+    try:
+        await asyncio.wait_for(_trace_queue.join(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Timed out flushing pending trace updates")
+    _trace_worker_task.cancel()
+    _trace_queue = None
+    _trace_worker_task = None
+
+
 # Comprehensive instructions for Claude Code
-INSTRUCTIONS = """This server provides access to a temporal knowledge graph memory system shared with GTD Coach.
+# InitializationOptions.instructions only accepts str, so the text is interned
+# once at import and the same object is handed to every session.
+INSTRUCTIONS = sys.intern(
+    """This server provides access to a temporal knowledge graph memory system shared with GTD Coach.
 
 AUTOMATIC BEHAVIORS:
 • At session start: Silently retrieve GTD context to prioritize work
@@ -211,6 +433,7 @@ TOOLS:
 • supersede_memory: Update existing memories
 • capture_command: Record command patterns
 • get_memory_evolution: Trace solution evolution
+• multi_query: Run several read-only memory queries concurrently, keyed by label
 • generate_commands: Create memory-aware Claude commands
 • analyze_langfuse_traces: Analyze recent Langfuse traces
 • analyze_phase_transitions: Analyze GTD phase transitions
@@ -220,6 +443,7 @@ TOOLS:
 • predict_trace_issues: Predict potential issues in traces
 • debug_langfuse_session: Debug a specific Langfuse session
 • monitor_active_traces: Monitor active traces in real-time
+• stop_trace_monitor: Stop background trace monitors
 
 RESOURCES:
 • memory://shared-knowledge: Overview of the shared knowledge graph
@@ -231,1093 +455,1810 @@ RESOURCES:
 • langfuse://patterns: Detected patterns from traces stored in Graphiti
 • langfuse://sessions: Active session information
 • langfuse://predictions: Current predictions and confidence scores"""
+)
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Environment-derived settings, read once instead of per request"""
+
+    group_id: Optional[str]
+    tracing_enabled: bool
+    trace_sample_rate: float
+    span_concurrency: int
+    max_concurrency: int
+    write_concurrency: int
+    tool_concurrency: int
+    expensive_concurrency: int
+    resource_ttl: float
+    # MCP_TRACE_TAG / MCP_ANALYZER_TAG, unset ones dropped so traces never
+    # carry a None tag
+    trace_tags: tuple
+    source_identifier: Optional[str]
+    component_version: Optional[str]
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        return cls(
+            group_id=os.getenv("GRAPHITI_GROUP_ID"),
+            tracing_enabled=os.getenv("LANGFUSE_TRACING_ENABLED", "true").lower()
+            != "false",
+            trace_sample_rate=float(os.getenv("MCP_TRACE_SAMPLE_RATE", "1.0")),
+            span_concurrency=int(os.getenv("MCP_SPAN_CONCURRENCY", "32")),
+            max_concurrency=int(os.getenv("GRAPHITI_MAX_CONCURRENCY", "8")),
+            write_concurrency=int(os.getenv("MCP_WRITE_CONCURRENCY", "10")),
+            tool_concurrency=int(os.getenv("MCP_MAX_CONCURRENCY", "16")),
+            expensive_concurrency=int(os.getenv("MCP_EXPENSIVE_CONCURRENCY", "4")),
+            resource_ttl=float(os.getenv("MCP_RESOURCE_TTL", "15")),
+            trace_tags=tuple(
+                tag
+                for tag in (os.getenv("MCP_TRACE_TAG"), os.getenv("MCP_ANALYZER_TAG"))
+                if tag
+            ),
+            source_identifier=os.getenv("MCP_SOURCE_IDENTIFIER"),
+            component_version=os.getenv("MCP_COMPONENT_VERSION"),
+        )
+
+
+# Rebuilt in main() once secrets are injected into the environment
+_config: Optional[ServerConfig] = None
+
+
+def _get_config() -> ServerConfig:
+    """Get the server config, reading the environment on first use"""
+    global _config
+    if _config is None:
+        _config = ServerConfig.from_env()
+    return _config
+
+
+# Cap on in-flight Graphiti searches, created on first use so the limit is read
+# after .env.graphiti and injected secrets are in place
+_search_semaphore: Optional[asyncio.Semaphore] = None
+
+# Transient backend failures are retried with exponential backoff; after
+# _BREAKER_FAIL_MAX searches fail outright, searches short-circuit to empty
+# results for _BREAKER_RESET seconds instead of piling onto a sick backend.
+# Other driver errors (auth, bad query) fail on the first try
+_TRANSIENT_SEARCH_ERRORS = (
+    ConnectionError,
+    ServiceUnavailable,
+    SessionExpired,
+    TransientError,
+    asyncio.TimeoutError,
+)
+_SEARCH_ATTEMPTS = 3
+_SEARCH_BACKOFF = 0.1
+_BREAKER_FAIL_MAX = 5
+_BREAKER_RESET = 30.0
+_breaker_failures = 0
+_breaker_open_until = 0.0
+# Searches short-circuited by the open breaker; a cached fetch that saw this
+# change is not stored, so the empty results aren't served after recovery
+_breaker_skips = 0
+
+
+async def _search(memory, *args, **kwargs):
+    """Run a temporal-weighted search, bounding concurrency against Graphiti"""
+    global _search_semaphore, _breaker_failures, _breaker_open_until, _breaker_skips
+    if time.monotonic() < _breaker_open_until:
+        _breaker_skips += 1
+        return []
+    if _search_semaphore is None:
+        _search_semaphore = asyncio.Semaphore(_get_config().max_concurrency)
+
+    for attempt in range(_SEARCH_ATTEMPTS):
+        try:
+            async with _search_semaphore:
+                results = await memory.search_with_temporal_weight(*args, **kwargs)
+        except _TRANSIENT_SEARCH_ERRORS:
+            if attempt + 1 < _SEARCH_ATTEMPTS:
+                # Back off outside the semaphore so other searches proceed
+                await asyncio.sleep(_SEARCH_BACKOFF * 2**attempt)
+                continue
+            _breaker_failures += 1
+            if _breaker_failures >= _BREAKER_FAIL_MAX:
+                _breaker_open_until = time.monotonic() + _BREAKER_RESET
+                logger.warning(
+                    "Graphiti search failing, skipping searches for %.0fs",
+                    _BREAKER_RESET,
+                )
+            raise
+        _breaker_failures = 0
+        return results
+
+
+# Tool concurrency caps, keyed by ServerConfig "<kind>_concurrency" field and
+# created on first use: "tool" bounds every call, "write" memory captures
+# (each fans out into several LLM calls inside Graphiti) and "expensive" the
+# unbounded graph traversals, so bursts queue here instead of piling into the
+# backend or provider rate limits
+_tool_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _tool_semaphore(kind: str) -> asyncio.Semaphore:
+    """Get the concurrency cap for a kind of tool work"""
+    semaphore = _tool_semaphores.get(kind)
+    if semaphore is None:
+        limit = getattr(_get_config(), f"{kind}_concurrency")
+        semaphore = _tool_semaphores[kind] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+def _limited(kind: str):
+    """Run a tool handler under the `kind` concurrency cap"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(langfuse_client, memory, capture, arguments):
+            async with _tool_semaphore(kind):
+                return await fn(langfuse_client, memory, capture, arguments)
+
+        return wrapper
+
+    return decorator
+
+
+def _ok_or_empty(results: Iterable[Any]) -> List[Any]:
+    """Swap failed searches from a gather(return_exceptions=True) for []"""
+    cleaned = []
+    for result in results:
+        if isinstance(result, BaseException):
+            # Cancellation (and other non-Exception signals) must propagate
+            if not isinstance(result, Exception):
+                raise result
+            logger.warning("GTD search failed: %s", result)
+            result = []
+        cleaned.append(result)
+    return cleaned
+
+
+# Per-trace analysis results (phase transitions, state continuity, predictions)
+# are cached briefly so dashboard polling doesn't refetch the same trace
+_RESULT_CACHE_TTL = 300.0
+_RESULT_CACHE_MAXSIZE = 1024
+_result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_result_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+def _store_result(
+    key: tuple, task: asyncio.Future, ttl: float, breaker_skips: int
+) -> None:
+    """Cache a finished result until it is ttl old; failures are not cached"""
+    if _result_inflight.get(key) is not task:
+        # Detached by _drop_cached_reads while running: its result predates
+        # the write, so it must not repopulate the cache
+        return
+    del _result_inflight[key]
+    if task.cancelled() or breaker_skips != _breaker_skips:
+        # Searches skipped by the open breaker made it an empty stand-in
+        return
+    error = task.exception()
+    if error is not None:
+        # Foreground fetches raise to their caller; a background refresh has
+        # no caller, so log it - the stale entry stays until its grace ends
+        if key in _result_cache:
+            logger.warning(
+                "Background refresh of %s failed, serving stale result",
+                key,
+                exc_info=error,
+            )
+        return
+    _result_cache[key] = (time.monotonic() + ttl, task.result())
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > _RESULT_CACHE_MAXSIZE:
+        _result_cache.popitem(last=False)
+
+
+def _start_fetch(key: tuple, factory, ttl: float) -> asyncio.Future:
+    """Start (or join) the shared fetch for key; it caches itself when done"""
+    task = _result_inflight.get(key)
+    if task is None:
+        # Held in _result_inflight until done, so background refreshes that
+        # nobody awaits are not garbage-collected mid-flight
+        task = asyncio.ensure_future(factory())
+        _result_inflight[key] = task
+        skips = _breaker_skips
+        task.add_done_callback(lambda t: _store_result(key, t, ttl, skips))
+    return task
+
+
+def _fresh_result(key: tuple) -> Optional[tuple]:
+    """The cached (expires_at, result) for key, if it hasn't expired"""
+    hit = _result_cache.get(key)
+    if hit is not None and time.monotonic() < hit[0]:
+        _result_cache.move_to_end(key)
+        return hit
+    return None
+
+
+async def _cached_result(
+    key: tuple, factory, ttl: float = _RESULT_CACHE_TTL, stale_grace: float = 0.0
+):
+    """Return a cached result for key, coalescing concurrent identical calls
+
+    Within ``stale_grace`` seconds past expiry the stale result is returned
+    immediately while a background fetch refreshes it.
+    """
+    hit = _result_cache.get(key)
+    if hit is not None:
+        now = time.monotonic()
+        if now < hit[0]:
+            _result_cache.move_to_end(key)
+            return hit[1]
+        if now < hit[0] + stale_grace:
+            _start_fetch(key, factory, ttl)
+            return hit[1]
+        del _result_cache[key]
+
+    task = _start_fetch(key, factory, ttl)
+    # Shielded so one caller going away doesn't cancel the shared fetch
+    return await asyncio.shield(task)
+
+
+# How long past MCP_RESOURCE_TTL a resource body may still be served while a
+# background read refreshes it; memory writes drop cached bodies regardless
+_RESOURCE_STALE_GRACE = 60.0
+
+# Read-only memory tools share the result cache with a short TTL, since
+# sessions repeat identical lookups; any memory write drops those entries
+_TOOL_CACHE_TTL = 30.0
+_MEMORY_WRITES = frozenset(
+    {"capture_solution", "capture_tdd_pattern", "capture_command", "supersede_memory"}
+)
+
+
+def _cached_tool(ttl: float = _TOOL_CACHE_TTL):
+    """Serve repeat calls of a read-only tool handler from the result cache"""
+
+    def decorator(fn):
+        def cache_key(arguments):
+            return (
+                "tool",
+                fn.__name__,
+                json.dumps(arguments, sort_keys=True, default=str),
+            )
+
+        @functools.wraps(fn)
+        async def wrapper(langfuse_client, memory, capture, arguments):
+            return await _cached_result(
+                cache_key(arguments),
+                lambda: fn(langfuse_client, memory, capture, arguments),
+                ttl,
+            )
+
+        # Lets _run_tool serve fresh hits before taking a concurrency slot
+        wrapper.cache_key = cache_key
+        return wrapper
+
+    return decorator
+
+
+def _drop_cached_reads() -> None:
+    """Forget cached read-only tool results and resource bodies after a write
+
+    In-flight reads are detached rather than cancelled, so their current
+    callers still get an answer but later calls start a fresh fetch.
+    """
+    for key in [key for key in _result_cache if key[0] in ("tool", "resource")]:
+        del _result_cache[key]
+    for key in [key for key in _result_inflight if key[0] in ("tool", "resource")]:
+        del _result_inflight[key]
+
+
+# Dedicated pool for blocking Langfuse API work (debug_session) so slow trace
+# fetches don't queue behind, or block, the loop's default executor
+_LANGFUSE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="langfuse-debug"
+)
+atexit.register(_LANGFUSE_EXECUTOR.shutdown, wait=False)
+
+_DEBUG_SESSION_UNAVAILABLE = {
+    "status": "error",
+    "message": "debug_session not available - analyze_langfuse_traces module not found",
+}
+
+# Ceiling (seconds) for the trace analysis behind langfuse://predictions
+_PREDICTIONS_TIMEOUT = 5.0
+# Top-K predictions returned by langfuse://predictions
+_MAX_PREDICTIONS = 50
 
 # Initialize MCP server
 server = Server("graphiti-claude-code-mcp")
 
 
-@server.list_resources()
-async def list_resources() -> List[Resource]:
-    """List available memory resources"""
-    return [
-        Resource(
-            uri="memory://shared-knowledge",
-            name="Shared Knowledge Graph",
-            description=f"Access to shared knowledge graph: {os.getenv('GRAPHITI_GROUP_ID')}",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="memory://gtd-context",
-            name="GTD Context",
-            description="Current GTD tasks and projects",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="memory://patterns",
-            name="Captured Patterns",
-            description="Coding patterns and solutions",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="memory://commands",
-            name="Generated Commands",
-            description="Claude Code commands with memory",
-            mimeType="text/markdown",
-        ),
-        # Langfuse trace analysis resources
-        Resource(
-            uri="langfuse://traces",
-            name="Recent Traces",
-            description="Recent Langfuse trace data from the last 24 hours",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="langfuse://patterns",
-            name="Detected Patterns",
-            description="Patterns detected from Langfuse traces stored in Graphiti",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="langfuse://sessions",
-            name="Active Sessions",
-            description="Active Langfuse session information",
-            mimeType="application/json",
-        ),
-        Resource(
-            uri="langfuse://predictions",
-            name="Trace Predictions",
-            description="Current predictions and confidence scores for trace issues",
-            mimeType="application/json",
-        ),
-    ]
+# Resource and tool listings are static; built on first list_* call (after
+# main() has read the group id) and reused for every later request
+_resources: Optional[Tuple[Resource, ...]] = None
+_tools: Optional[Tuple[Tool, ...]] = None
 
 
-@server.read_resource()
-async def read_resource(uri: str) -> str:
-    """Read a memory resource"""
-    memory = await get_shared_memory()
-
-    if uri == "memory://shared-knowledge":
-        # Return overview of shared knowledge
-        stats = {
-            "group_id": memory.group_id,
-            "database": memory.database,
-            "total_memories": await _count_memories(memory),
-            "sources": ["claude_code", "gtd_coach"],
-            "features": {
-                "temporal_weighting": True,
-                "supersession_tracking": True,
-                "cross_domain_search": memory.enable_cross_ref,
-                "gtd_integration": memory.enable_gtd,
-            },
-        }
-        return json.dumps(stats, indent=2)
-
-    elif uri == "memory://gtd-context":
-        # Get current GTD context
-        tasks = await memory.search_with_temporal_weight(
-            "task @computer active", filter_source="gtd_coach"
+@server.list_resources()
+async def list_resources() -> Tuple[Resource, ...]:
+    """List available memory resources"""
+    global _resources
+    if _resources is None:
+        _resources = (
+            Resource(
+                uri="memory://shared-knowledge",
+                name="Shared Knowledge Graph",
+                description=f"Access to shared knowledge graph: {_get_config().group_id}",
+                mimeType="application/json",
+            ),
+            Resource(
+                uri="memory://gtd-context",
+                name="GTD Context",
+                description="Current GTD tasks and projects",
+                mimeType="application/json",
+            ),
+            Resource(
+                uri="memory://patterns",
+                name="Captured Patterns",
+                description="Coding patterns and solutions",
+                mimeType="application/json",
+            ),
+            Resource(
+                uri="memory://commands",
+                name="Generated Commands",
+                description="Claude Code commands with memory",
+                mimeType="text/markdown",
+            ),
+            # Langfuse trace analysis resources
+            Resource(
+                uri="langfuse://traces",
+                name="Recent Traces",
+                description="Recent Langfuse trace data from the last 24 hours",
+                mimeType="application/json",
+            ),
+            Resource(
+                uri="langfuse://patterns",
+                name="Detected Patterns",
+                description="Patterns detected from Langfuse traces stored in Graphiti",
+                mimeType="application/json",
+            ),
+            Resource(
+                uri="langfuse://sessions",
+                name="Active Sessions",
+                description="Active Langfuse session information",
+                mimeType="application/json",
+            ),
+            Resource(
+                uri="langfuse://predictions",
+                name="Trace Predictions",
+                description="Current predictions and confidence scores for trace issues",
+                mimeType="application/json",
+            ),
         )
-        projects = await memory.search_with_temporal_weight(
-            "project active", filter_source="gtd_coach"
+    return _resources
+
+
+def _new_session_summary() -> Dict[str, Any]:
+    """Empty per-session aggregate for langfuse://sessions"""
+    return {"trace_count": 0, "error_count": 0, "latest_timestamp": None}
+
+
+async def _r_shared_knowledge() -> str:
+    """Overview of the shared knowledge graph"""
+    memory = _memory or await get_shared_memory()
+    stats = {
+        "group_id": memory.group_id,
+        "database": memory.database,
+        "total_memories": await _count_memories(memory),
+        "sources": ["claude_code", "gtd_coach"],
+        "features": {
+            "temporal_weighting": True,
+            "supersession_tracking": True,
+            "cross_domain_search": memory.enable_cross_ref,
+            "gtd_integration": memory.enable_gtd,
+        },
+    }
+    return _dumps_compact(stats)
+
+
+async def _r_gtd_context() -> str:
+    """Current GTD tasks and projects"""
+    memory = _memory or await get_shared_memory()
+    # Get current GTD context - both searches run concurrently
+    # A failed search degrades to an empty section instead of failing the read
+    tasks, projects = _ok_or_empty(
+        await asyncio.gather(
+            _search(
+                memory, "task @computer active", filter_source="gtd_coach", limit=5
+            ),
+            _search(memory, "project active", filter_source="gtd_coach", limit=3),
+            return_exceptions=True,
         )
+    )
 
-        context = {
-            "active_tasks": [_format_memory(t) for t in tasks[:5]],
-            "active_projects": [_format_memory(p) for p in projects[:3]],
+    context = {
+        "active_tasks": _format_memories(tasks),
+        "active_projects": _format_memories(projects),
+    }
+    return _dumps_compact(context)
+
+
+async def _r_patterns() -> str:
+    """Captured coding pattern counts per pattern type"""
+    capture = _capture or await get_pattern_capture()
+    patterns = {}
+
+    evolutions = await asyncio.gather(
+        *(capture.get_pattern_evolution(pattern_type) for pattern_type in PatternType)
+    )
+    for pattern_type, evolution in zip(PatternType, evolutions):
+        patterns[pattern_type.value] = {
+            "active": evolution.get("active_patterns", 0),
+            "superseded": evolution.get("superseded_patterns", 0),
+            "total": evolution.get("total_iterations", 0),
         }
-        return json.dumps(context, indent=2)
-
-    elif uri == "memory://patterns":
-        # Get captured patterns
-        capture = await get_pattern_capture()
-        patterns = {}
-
-        for pattern_type in PatternType:
-            evolution = await capture.get_pattern_evolution(pattern_type)
-            patterns[pattern_type.value] = {
-                "active": evolution.get("active_patterns", 0),
-                "superseded": evolution.get("superseded_patterns", 0),
-                "total": evolution.get("total_iterations", 0),
-            }
-
-        return json.dumps(patterns, indent=2)
-
-    elif uri == "memory://commands":
-        # Return generated commands index
-        generator = await get_command_generator()
-        index = await generator.generate_all_commands()
-        return index
-
-    # Langfuse trace analysis resources
-    elif uri == "langfuse://traces":
-        # Get recent traces from last 24 hours
-        analyzer = await get_langfuse_analyzer()
-        result = await analyzer.analyze_recent_traces(hours_back=24)
-        return json.dumps(
-            {
-                "traces_analyzed": result.get("traces_analyzed", 0),
-                "errors": result.get("errors", []),
-                "interrupts": result.get("interrupts", []),
-                "patterns": result.get("patterns", []),
-                "timestamp": datetime.now().isoformat(),
-            },
-            indent=2,
-        )
 
-    elif uri == "langfuse://patterns":
-        # Get patterns detected from Langfuse traces stored in Graphiti
-        memory = await get_shared_memory()
-        patterns = await memory.search_with_temporal_weight(
-            "langfuse pattern detected", filter_source="claude_code"
+    return _dumps_compact(patterns)
+
+
+async def _r_commands() -> str:
+    """Generated Claude Code commands index"""
+    generator = _generator or await get_command_generator()
+    index = await generator.generate_all_commands()
+    return index
+
+
+async def _r_langfuse_traces() -> str:
+    """Recent trace analysis from the last 24 hours"""
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    result = await analyzer.analyze_recent_traces(hours_back=24)
+    errors = result.get("errors", [])
+    interrupts = result.get("interrupts", [])
+    trace_patterns = result.get("patterns", [])
+    return await _dumps_resource(
+        {
+            "traces_analyzed": result.get("traces_analyzed", 0),
+            "errors": errors,
+            "interrupts": interrupts,
+            "patterns": trace_patterns,
+            "timestamp": datetime.now().isoformat(),
+        },
+        len(errors) + len(interrupts) + len(trace_patterns),
+    )
+
+
+async def _r_langfuse_patterns() -> str:
+    """Langfuse-detected patterns stored in Graphiti"""
+    memory = _memory or await get_shared_memory()
+    # Get patterns detected from Langfuse traces stored in Graphiti
+    patterns = await _search(
+        memory, "langfuse pattern detected", filter_source="claude_code"
+    )
+    return _dumps_compact(
+        {
+            "detected_patterns": _format_memories(patterns, 20),
+            "total_patterns": len(patterns),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+
+
+async def _r_langfuse_sessions() -> str:
+    """Active sessions seen in the last hour"""
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    # Get traces from last hour to find active sessions
+    result = await analyzer.analyze_recent_traces(hours_back=1)
+    sessions = defaultdict(_new_session_summary)
+    for trace in result.get("traces", ()):
+        get = trace.get
+        summary = sessions[get("session_id", "unknown")]
+        summary["trace_count"] += 1
+        if get("has_errors"):
+            summary["error_count"] += 1
+        timestamp = get("timestamp")
+        # ISO-8601 strings from the analyzer compare chronologically
+        if timestamp and (
+            summary["latest_timestamp"] is None
+            or timestamp > summary["latest_timestamp"]
+        ):
+            summary["latest_timestamp"] = timestamp
+
+    return await _dumps_resource(
+        {
+            "active_sessions": sessions,
+            "total_sessions": len(sessions),
+            "timestamp": datetime.now().isoformat(),
+        },
+        len(sessions),
+    )
+
+
+async def _r_langfuse_predictions() -> str:
+    """Current predictions and confidence scores"""
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    # Analyze recent traces for predictions, bounded so a slow analysis
+    # cannot hold the resource read indefinitely
+    try:
+        result = await asyncio.wait_for(
+            analyzer.analyze_recent_traces(hours_back=1),
+            timeout=_PREDICTIONS_TIMEOUT,
         )
-        return json.dumps(
-            {
-                "detected_patterns": [_format_memory(p) for p in patterns[:20]],
-                "total_patterns": len(patterns),
-                "timestamp": datetime.now().isoformat(),
-            },
-            indent=2,
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Prediction analysis exceeded %ss, returning partial result",
+            _PREDICTIONS_TIMEOUT,
         )
-
-    elif uri == "langfuse://sessions":
-        # Get active session information
-        analyzer = await get_langfuse_analyzer()
-        # Get traces from last hour to find active sessions
-        result = await analyzer.analyze_recent_traces(hours_back=1)
-        sessions = {}
-        for trace in result.get("traces", []):
-            session_id = trace.get("session_id", "unknown")
-            if session_id not in sessions:
-                sessions[session_id] = {
-                    "trace_count": 0,
-                    "error_count": 0,
-                    "latest_timestamp": None,
+        result = {}
+    predictions = []
+    high_confidence_count = 0
+
+    for pattern in result.get("patterns", []):
+        confidence = pattern.get("confidence", 0)
+        if confidence > 0.5:
+            predictions.append(
+                {
+                    "pattern": pattern.get("signature"),
+                    "confidence": confidence,
+                    "resolution": pattern.get("resolution"),
+                    "trace_id": pattern.get("trace_id"),
                 }
-            sessions[session_id]["trace_count"] += 1
-            if trace.get("has_errors"):
-                sessions[session_id]["error_count"] += 1
-            timestamp = trace.get("timestamp")
-            if timestamp and (
-                not sessions[session_id]["latest_timestamp"]
-                or timestamp > sessions[session_id]["latest_timestamp"]
-            ):
-                sessions[session_id]["latest_timestamp"] = timestamp
-
-        return json.dumps(
-            {
-                "active_sessions": sessions,
-                "total_sessions": len(sessions),
-                "timestamp": datetime.now().isoformat(),
-            },
-            indent=2,
-        )
+            )
+            if confidence > 0.8:
+                high_confidence_count += 1
 
-    elif uri == "langfuse://predictions":
-        # Get current predictions and confidence scores
-        analyzer = await get_langfuse_analyzer()
-        # Analyze recent traces for predictions
-        result = await analyzer.analyze_recent_traces(hours_back=1)
-        predictions = []
-
-        for pattern in result.get("patterns", []):
-            if pattern.get("confidence", 0) > 0.5:
-                predictions.append(
-                    {
-                        "pattern": pattern.get("signature"),
-                        "confidence": pattern.get("confidence"),
-                        "resolution": pattern.get("resolution"),
-                        "trace_id": pattern.get("trace_id"),
-                    }
-                )
+    return _dumps_compact(
+        {
+            "predictions": heapq.nlargest(
+                _MAX_PREDICTIONS, predictions, key=itemgetter("confidence")
+            ),
+            "high_confidence_count": high_confidence_count,
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
 
-        return json.dumps(
-            {
-                "predictions": sorted(
-                    predictions, key=lambda x: x["confidence"], reverse=True
-                ),
-                "high_confidence_count": len(
-                    [p for p in predictions if p["confidence"] > 0.8]
-                ),
-                "timestamp": datetime.now().isoformat(),
-            },
-            indent=2,
-        )
 
-    else:
+_RESOURCE_HANDLERS = {
+    "memory://shared-knowledge": _r_shared_knowledge,
+    "memory://gtd-context": _r_gtd_context,
+    "memory://patterns": _r_patterns,
+    "memory://commands": _r_commands,
+    "langfuse://traces": _r_langfuse_traces,
+    "langfuse://patterns": _r_langfuse_patterns,
+    "langfuse://sessions": _r_langfuse_sessions,
+    "langfuse://predictions": _r_langfuse_predictions,
+}
+
+
+@server.read_resource()
+async def read_resource(uri: str) -> str:
+    """Read a memory resource"""
+    # The SDK passes a pydantic AnyUrl; handlers are keyed by its string form
+    key = str(uri)
+    handler = _RESOURCE_HANDLERS.get(key)
+    if handler is None:
         raise ValueError(f"Unknown resource: {uri}")
+    # Bursty re-reads of the same URI share one serialized body for a few
+    # seconds, and polling past that gets the previous body while it is
+    # refreshed in the background; MCP_RESOURCE_TTL=0 turns this off
+    ttl = _get_config().resource_ttl
+    if ttl <= 0:
+        return await handler()
+    return await _cached_result(
+        ("resource", key), handler, ttl, stale_grace=_RESOURCE_STALE_GRACE
+    )
 
 
 @server.list_tools()
-async def list_tools() -> List[Tool]:
+async def list_tools() -> Tuple[Tool, ...]:
     """List available memory tools"""
-    return [
-        Tool(
-            name="capture_solution",
-            description="Capture a coding solution or fix",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "error": {
-                        "type": "string",
-                        "description": "Error or problem description",
-                    },
-                    "solution": {
-                        "type": "string",
-                        "description": "Solution that worked",
-                    },
-                    "context": {"type": "object", "description": "Additional context"},
-                    "gtd_task_id": {
-                        "type": "string",
-                        "description": "Optional GTD task ID to link",
+    global _tools
+    if _tools is None:
+        _tools = (
+            Tool(
+                name="capture_solution",
+                description="Capture a coding solution or fix",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "error": {
+                            "type": "string",
+                            "description": "Error or problem description",
+                        },
+                        "solution": {
+                            "type": "string",
+                            "description": "Solution that worked",
+                        },
+                        "context": {
+                            "type": "object",
+                            "description": "Additional context",
+                        },
+                        "gtd_task_id": {
+                            "type": "string",
+                            "description": "Optional GTD task ID to link",
+                        },
                     },
+                    "required": ["error", "solution"],
                 },
-                "required": ["error", "solution"],
-            },
-        ),
-        Tool(
-            name="capture_tdd_pattern",
-            description="Capture TDD red-green-refactor pattern",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "test_code": {
-                        "type": "string",
-                        "description": "Test code (red phase)",
-                    },
-                    "implementation": {
-                        "type": "string",
-                        "description": "Implementation (green phase)",
-                    },
-                    "refactored": {
-                        "type": "string",
-                        "description": "Refactored code (optional)",
+            ),
+            Tool(
+                name="capture_tdd_pattern",
+                description="Capture TDD red-green-refactor pattern",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "test_code": {
+                            "type": "string",
+                            "description": "Test code (red phase)",
+                        },
+                        "implementation": {
+                            "type": "string",
+                            "description": "Implementation (green phase)",
+                        },
+                        "refactored": {
+                            "type": "string",
+                            "description": "Refactored code (optional)",
+                        },
+                        "feature_name": {
+                            "type": "string",
+                            "description": "Feature name",
+                        },
                     },
-                    "feature_name": {"type": "string", "description": "Feature name"},
+                    "required": ["test_code", "feature_name"],
                 },
-                "required": ["test_code", "feature_name"],
-            },
-        ),
-        Tool(
-            name="search_memory",
-            description="Search shared knowledge graph",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Search query"},
-                    "include_historical": {
-                        "type": "boolean",
-                        "description": "Include historical memories",
-                    },
-                    "filter_source": {
-                        "type": "string",
-                        "description": "Filter by source (claude_code, gtd_coach)",
+            ),
+            Tool(
+                name="search_memory",
+                description="Search shared knowledge graph",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {"type": "string", "description": "Search query"},
+                        "include_historical": {
+                            "type": "boolean",
+                            "description": "Include historical memories",
+                        },
+                        "filter_source": {
+                            "type": "string",
+                            "description": "Filter by source (claude_code, gtd_coach)",
+                        },
+                        "min_score": {
+                            "type": "number",
+                            "description": "Only return memories scoring at least this, 0-1: search rank scaled down by age and status (e.g. 0.5)",
+                        },
                     },
+                    "required": ["query"],
                 },
-                "required": ["query"],
-            },
-        ),
-        Tool(
-            name="find_cross_insights",
-            description="Find cross-domain insights between GTD and coding",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "topic": {"type": "string", "description": "Topic to explore"}
-                },
-                "required": ["topic"],
-            },
-        ),
-        Tool(
-            name="get_gtd_context",
-            description="Get current GTD context for coding session",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        Tool(
-            name="supersede_memory",
-            description="Mark old memory as superseded by new one",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "old_id": {
-                        "type": "string",
-                        "description": "ID of memory to supersede",
-                    },
-                    "new_content": {
-                        "type": "object",
-                        "description": "New memory content",
-                    },
-                    "reason": {
-                        "type": "string",
-                        "description": "Reason for supersession",
+            ),
+            Tool(
+                name="find_cross_insights",
+                description="Find cross-domain insights between GTD and coding",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "topic": {"type": "string", "description": "Topic to explore"}
                     },
+                    "required": ["topic"],
                 },
-                "required": ["old_id", "new_content", "reason"],
-            },
-        ),
-        Tool(
-            name="capture_command",
-            description="Capture frequently used command pattern",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "Command that was run",
-                    },
-                    "context": {
-                        "type": "string",
-                        "description": "Context where useful",
-                    },
-                    "success": {
-                        "type": "boolean",
-                        "description": "Whether it succeeded",
-                    },
-                    "output": {
-                        "type": "string",
-                        "description": "Command output (optional)",
+            ),
+            Tool(
+                name="get_gtd_context",
+                description="Get current GTD context for coding session",
+                inputSchema={"type": "object", "properties": {}},
+            ),
+            Tool(
+                name="supersede_memory",
+                description="Mark old memory as superseded by new one",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "old_id": {
+                            "type": "string",
+                            "description": "ID of memory to supersede",
+                        },
+                        "new_content": {
+                            "type": "object",
+                            "description": "New memory content",
+                        },
+                        "reason": {
+                            "type": "string",
+                            "description": "Reason for supersession",
+                        },
                     },
+                    "required": ["old_id", "new_content", "reason"],
                 },
-                "required": ["command", "context", "success"],
-            },
-        ),
-        Tool(
-            name="get_memory_evolution",
-            description="Get evolution history of a topic",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "topic": {
-                        "type": "string",
-                        "description": "Topic to trace evolution",
-                    }
-                },
-                "required": ["topic"],
-            },
-        ),
-        Tool(
-            name="generate_commands",
-            description="Generate Claude Code commands with memory",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        # Langfuse Trace Analysis Tools
-        Tool(
-            name="analyze_langfuse_traces",
-            description="Analyze recent Langfuse traces and detect patterns",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "hours_back": {
-                        "type": "integer",
-                        "description": "Hours to look back (default: 1)",
-                    },
-                    "session_id": {
-                        "type": "string",
-                        "description": "Optional specific session to analyze",
-                    },
-                    "project": {
-                        "type": "string",
-                        "description": "Optional project name for filtering",
+            ),
+            Tool(
+                name="capture_command",
+                description="Capture frequently used command pattern",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "command": {
+                            "type": "string",
+                            "description": "Command that was run",
+                        },
+                        "context": {
+                            "type": "string",
+                            "description": "Context where useful",
+                        },
+                        "success": {
+                            "type": "boolean",
+                            "description": "Whether it succeeded",
+                        },
+                        "output": {
+                            "type": "string",
+                            "description": "Command output (optional)",
+                        },
                     },
+                    "required": ["command", "context", "success"],
                 },
-                "required": [],
-            },
-        ),
-        Tool(
-            name="analyze_phase_transitions",
-            description="Analyze phase transitions for state loss detection",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "trace_id": {
-                        "type": "string",
-                        "description": "Specific trace to analyze",
-                    },
-                    "session_id": {
-                        "type": "string",
-                        "description": "Session to analyze all traces",
+            ),
+            Tool(
+                name="get_memory_evolution",
+                description="Get evolution history of a topic",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "topic": {
+                            "type": "string",
+                            "description": "Topic to trace evolution",
+                        }
                     },
+                    "required": ["topic"],
                 },
-                "required": [],
-            },
-        ),
-        Tool(
-            name="validate_state_continuity",
-            description="Validate state continuity across observations",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "trace_id": {
-                        "type": "string",
-                        "description": "Specific trace to validate",
-                    },
-                    "session_id": {
-                        "type": "string",
-                        "description": "Session to validate all traces",
+            ),
+            Tool(
+                name="multi_query",
+                description="Run several read-only memory queries concurrently",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "queries": {
+                            "type": "array",
+                            "description": "Queries to run, results keyed by label",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "label": {"type": "string"},
+                                    "tool": {
+                                        "type": "string",
+                                        "enum": sorted(_MULTI_QUERY_TOOLS),
+                                    },
+                                    "arguments": {"type": "object"},
+                                },
+                                "required": ["label", "tool"],
+                            },
+                        }
                     },
+                    "required": ["queries"],
                 },
-                "required": [],
-            },
-        ),
-        Tool(
-            name="analyze_test_failure",
-            description="Analyze test failure session with AI-optimized output",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "session_id": {
-                        "type": "string",
-                        "description": "Test session ID to analyze",
+            ),
+            Tool(
+                name="generate_commands",
+                description="Generate Claude Code commands with memory",
+                inputSchema={"type": "object", "properties": {}},
+            ),
+            # Langfuse Trace Analysis Tools
+            Tool(
+                name="analyze_langfuse_traces",
+                description="Analyze recent Langfuse traces and detect patterns",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "hours_back": {
+                            "type": "integer",
+                            "description": "Hours to look back (default: 1)",
+                        },
+                        "session_id": {
+                            "type": "string",
+                            "description": "Optional specific session to analyze",
+                        },
+                        "project": {
+                            "type": "string",
+                            "description": "Optional project name for filtering",
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Traces per page (default: 50)",
+                        },
+                        "page": {
+                            "type": "integer",
+                            "description": "Page to analyze, see next_page in the result (default: 1)",
+                        },
                     },
-                    "return_patterns": {
-                        "type": "boolean",
-                        "description": "Whether to detect patterns (default: true)",
+                    "required": [],
+                },
+            ),
+            Tool(
+                name="analyze_phase_transitions",
+                description="Analyze phase transitions for state loss detection",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "trace_id": {
+                            "type": "string",
+                            "description": "Specific trace to analyze",
+                        },
+                        "session_id": {
+                            "type": "string",
+                            "description": "Session to analyze all traces",
+                        },
                     },
+                    "required": [],
                 },
-                "required": ["session_id"],
-            },
-        ),
-        Tool(
-            name="detect_interrupt_patterns",
-            description="Detect interrupt patterns in traces",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "hours_back": {
-                        "type": "integer",
-                        "description": "Hours to look back (default: 1)",
+            ),
+            Tool(
+                name="validate_state_continuity",
+                description="Validate state continuity across observations",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "trace_id": {
+                            "type": "string",
+                            "description": "Specific trace to validate",
+                        },
+                        "session_id": {
+                            "type": "string",
+                            "description": "Session to validate all traces",
+                        },
                     },
-                    "session_id": {
-                        "type": "string",
-                        "description": "Optional specific session",
+                    "required": [],
+                },
+            ),
+            Tool(
+                name="analyze_test_failure",
+                description="Analyze test failure session with AI-optimized output",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "session_id": {
+                            "type": "string",
+                            "description": "Test session ID to analyze",
+                        },
+                        "return_patterns": {
+                            "type": "boolean",
+                            "description": "Whether to detect patterns (default: true)",
+                        },
                     },
+                    "required": ["session_id"],
                 },
-                "required": [],
-            },
-        ),
-        Tool(
-            name="predict_trace_issues",
-            description="Predict potential issues based on historical patterns",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "trace_id": {"type": "string", "description": "Trace to analyze"},
-                    "threshold": {
-                        "type": "number",
-                        "description": "Confidence threshold (default: 0.7)",
+            ),
+            Tool(
+                name="detect_interrupt_patterns",
+                description="Detect interrupt patterns in traces",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "hours_back": {
+                            "type": "integer",
+                            "description": "Hours to look back (default: 1)",
+                        },
+                        "session_id": {
+                            "type": "string",
+                            "description": "Optional specific session",
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Traces per page (default: 50)",
+                        },
+                        "page": {
+                            "type": "integer",
+                            "description": "Page to scan, see next_page in the result (default: 1)",
+                        },
                     },
+                    "required": [],
                 },
-                "required": ["trace_id"],
-            },
-        ),
-        Tool(
-            name="debug_langfuse_session",
-            description="Comprehensive debug mode for a session",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "session_id": {
-                        "type": "string",
-                        "description": "Session ID to debug",
+            ),
+            Tool(
+                name="predict_trace_issues",
+                description="Predict potential issues based on historical patterns",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "trace_id": {
+                            "type": "string",
+                            "description": "Trace to analyze",
+                        },
+                        "threshold": {
+                            "type": "number",
+                            "description": "Confidence threshold (default: 0.7)",
+                        },
                     },
-                    "focus": {
-                        "type": "string",
-                        "description": "Focus area: transitions, prompts, conversation, state, or all (default: all)",
+                    "required": ["trace_id"],
+                },
+            ),
+            Tool(
+                name="debug_langfuse_session",
+                description="Comprehensive debug mode for a session",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "session_id": {
+                            "type": "string",
+                            "description": "Session ID to debug",
+                        },
+                        "focus": {
+                            "type": "string",
+                            "description": "Focus area: transitions, prompts, conversation, state, or all (default: all)",
+                        },
                     },
+                    "required": ["session_id"],
                 },
-                "required": ["session_id"],
-            },
-        ),
-        Tool(
-            name="monitor_active_traces",
-            description="Monitor active traces in real-time",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project": {
-                        "type": "string",
-                        "description": "Optional project to monitor",
+            ),
+            Tool(
+                name="monitor_active_traces",
+                description="Monitor active traces in real-time",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "project": {
+                            "type": "string",
+                            "description": "Optional project to monitor",
+                        },
+                        "interval_seconds": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "description": "Monitoring interval (default: 30)",
+                        },
                     },
-                    "interval_seconds": {
-                        "type": "integer",
-                        "description": "Monitoring interval (default: 30)",
+                    "required": [],
+                },
+            ),
+            Tool(
+                name="stop_trace_monitor",
+                description="Stop background trace monitors",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "project": {
+                            "type": "string",
+                            "description": "Project whose monitors to stop (default: all monitors)",
+                        },
                     },
+                    "required": [],
                 },
-                "required": [],
-            },
+            ),
+        )
+    return _tools
+
+
+# Background trace monitors started by monitor_active_traces, keyed by
+# (project, interval_seconds). Polling backs off while no new traces arrive.
+_MONITOR_MIN_INTERVAL = 1
+_MONITOR_MAX_INTERVAL = 300
+_MONITOR_MAX_ACTIVE = 8
+_monitors: Dict[tuple, asyncio.Task] = {}
+_monitor_state: Dict[tuple, Dict[str, Any]] = {}
+
+
+async def _monitor_loop(key: tuple, interval_seconds: int) -> None:
+    """Poll Langfuse for new traces until cancelled"""
+    state = _monitor_state[key]
+    since = datetime.now() - timedelta(seconds=interval_seconds)
+    delay = interval_seconds
+
+    while True:
+        polled_at = datetime.now()
+        try:
+            analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+            traces = await analyzer.poll_recent_traces(since)
+        except Exception as e:
+            logger.warning("Trace monitor %s poll failed: %s", key[0], e)
+            traces = []
+
+        if traces:
+            since = polled_at
+            delay = interval_seconds
+            state["new_traces"] = traces
+            state["total_new_traces"] += len(traces)
+            logger.info("Trace monitor %s: %d new traces", key[0], len(traces))
+        else:
+            delay = min(delay * 2, max(interval_seconds, _MONITOR_MAX_INTERVAL))
+
+        state["last_poll"] = polled_at.isoformat()
+        state["next_poll_seconds"] = delay
+        await asyncio.sleep(delay)
+
+
+def _start_trace_monitor(project: str, interval_seconds: int) -> Dict[str, Any]:
+    """Start a monitor for project/interval unless one is already running"""
+    if (
+        not isinstance(interval_seconds, int)
+        or interval_seconds < _MONITOR_MIN_INTERVAL
+    ):
+        raise ValueError(
+            f"interval_seconds must be an integer >= {_MONITOR_MIN_INTERVAL}, "
+            f"got {interval_seconds!r}"
+        )
+
+    key = (project, interval_seconds)
+    task = _monitors.get(key)
+    running = task is not None and not task.done()
+
+    if not running:
+        # Forget monitors that ended on their own before counting slots
+        for done_key in [k for k, t in _monitors.items() if t.done()]:
+            _monitors.pop(done_key)
+            _monitor_state.pop(done_key, None)
+        if len(_monitors) >= _MONITOR_MAX_ACTIVE:
+            return {
+                "status": "error",
+                "message": (
+                    f"{_MONITOR_MAX_ACTIVE} trace monitors already running - "
+                    "stop one with stop_trace_monitor first"
+                ),
+                "active_monitors": len(_monitors),
+            }
+        _monitor_state[key] = {
+            "project": project,
+            "interval_seconds": interval_seconds,
+            "started_at": datetime.now().isoformat(),
+            "last_poll": None,
+            "next_poll_seconds": interval_seconds,
+            "new_traces": [],
+            "total_new_traces": 0,
+        }
+        _monitors[key] = asyncio.create_task(_monitor_loop(key, interval_seconds))
+
+    return {
+        "status": "success",
+        "message": (
+            f"Monitor already running for {project}"
+            if running
+            else f"Started monitoring {project} every {interval_seconds} seconds"
         ),
-    ]
+        "monitor": dict(_monitor_state[key]),
+        "active_monitors": len(_monitors),
+    }
+
+
+async def _stop_trace_monitors(project: Optional[str] = None) -> Dict[str, Any]:
+    """Cancel monitors for a project, or all monitors when project is None"""
+    keys = [key for key in _monitors if project is None or key[0] == project]
+    tasks = [_monitors.pop(key) for key in keys]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for key in keys:
+        _monitor_state.pop(key, None)
+
+    return {
+        "status": "success",
+        "stopped": len(tasks),
+        "active_monitors": len(_monitors),
+    }
+
+
+# Commands written by CommandGenerator.generate_all_commands()
+_GENERATED_COMMANDS = (
+    "/tdd-feature",
+    "/check-deployment",
+    "/fix-docker",
+    "/project-structure",
+    "/search-memory",
+)
+
+
+# Tool handlers - each receives the Langfuse client (for Graphiti/analyzer
+# sub-spans), the shared memory, the pattern capture and the tool arguments
+
+
+def _traced_tool(span_name: str, metadata_fn=None):
+    """Run a tool handler inside a ``span_name`` sub-span.
+
+    ``metadata_fn`` maps the tool arguments to the span metadata; it is only
+    called when the call is actually traced. Keeping the span boilerplate
+    here means every handler opens its sub-span through one code path
+    instead of its own ``with`` block.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(langfuse_client, memory, capture, arguments):
+            # Untraced calls skip the span and never build its metadata
+            if langfuse_client is _NOOP_LANGFUSE:
+                return await fn(langfuse_client, memory, capture, arguments)
+            metadata = metadata_fn(arguments) if metadata_fn else None
+            with langfuse_client.start_as_current_span(
+                name=span_name, metadata=metadata
+            ):
+                return await fn(langfuse_client, memory, capture, arguments)
+
+        return wrapper
+
+    return decorator
+
+
+@_limited("write")
+@_traced_tool("graphiti_capture_solution", lambda a: {"error": a["error"][:100]})
+async def _h_capture_solution(langfuse_client, memory, capture, arguments):
+    # Capture deployment/coding solution
+    memory_id = await capture.capture_deployment_solution(
+        error=arguments["error"],
+        solution=arguments["solution"],
+        context=arguments.get("context", {}),
+    )
+
+    # Link to GTD if provided
+    gtd_task_id = arguments.get("gtd_task_id")
+    if gtd_task_id:
+        await memory.link_to_gtd_task(memory_id, gtd_task_id)
+
+    return {
+        "status": "success",
+        "memory_id": memory_id,
+        "message": f"Captured solution: {memory_id}",
+    }
+
+
+@_limited("write")
+@_traced_tool("graphiti_capture_tdd", lambda a: {"feature": a.get("feature_name")})
+async def _h_capture_tdd_pattern(langfuse_client, memory, capture, arguments):
+    feature_name = arguments["feature_name"]
+
+    # Capture TDD pattern
+    memory_id = await capture.capture_tdd_cycle(
+        test_code=arguments["test_code"],
+        implementation=arguments.get("implementation"),
+        refactored=arguments.get("refactored"),
+        feature_name=feature_name,
+    )
+
+    return {
+        "status": "success",
+        "memory_id": memory_id,
+        "message": f"Captured TDD pattern for {feature_name}",
+    }
+
+
+@_cached_tool()
+@_traced_tool("graphiti_search", lambda a: {"query": a["query"]})
+async def _h_search_memory(langfuse_client, memory, capture, arguments):
+    # Search shared knowledge
+    results = await _search(
+        memory,
+        query=arguments["query"],
+        include_historical=arguments.get("include_historical", False),
+        filter_source=arguments.get("filter_source"),
+        min_score=arguments.get("min_score"),
+    )
+
+    return {
+        "status": "success",
+        "count": len(results),
+        "results": _format_memories(results),
+    }
+
+
+@_cached_tool()
+@_limited("expensive")
+@_traced_tool("graphiti_cross_insights", lambda a: {"topic": a["topic"]})
+async def _h_find_cross_insights(langfuse_client, memory, capture, arguments):
+    # Find cross-domain insights
+    insights = await memory.find_cross_domain_insights(arguments["topic"])
+
+    return {
+        "status": "success",
+        "insights": insights,
+        "message": f"Found {len(insights)} cross-domain insights",
+    }
+
+
+@_cached_tool()
+@_traced_tool("graphiti_gtd_context", lambda a: {"operation": "multi_search"})
+async def _h_get_gtd_context(langfuse_client, memory, capture, arguments):
+    # Multi-search for GTD context - independent, so issued concurrently
+    # A failed search degrades to an empty section instead of failing the tool
+    tasks, projects, reviews = _ok_or_empty(
+        await asyncio.gather(
+            _search(memory, "@computer task", filter_source="gtd_coach", limit=5),
+            _search(memory, "project active", filter_source="gtd_coach", limit=3),
+            _search(memory, "review insight", filter_source="gtd_coach", limit=3),
+            return_exceptions=True,
+        )
+    )
+
+    return {
+        "status": "success",
+        "context": {
+            "active_tasks": _format_memories(tasks),
+            "active_projects": _format_memories(projects),
+            "recent_insights": _format_memories(reviews),
+        },
+    }
+
+
+@_limited("write")
+@_traced_tool(
+    "graphiti_supersede",
+    lambda a: {"old_id": a["old_id"], "reason": a["reason"]},
+)
+async def _h_supersede_memory(langfuse_client, memory, capture, arguments):
+    old_id = arguments["old_id"]
+
+    # Supersede old memory
+    new_id = await memory.supersede_memory(
+        old_id=old_id,
+        new_content=arguments["new_content"],
+        reason=arguments["reason"],
+    )
+
+    return {
+        "status": "success",
+        "new_id": new_id,
+        "message": f"Superseded {old_id} with {new_id}",
+    }
+
+
+@_limited("write")
+@_traced_tool(
+    "graphiti_capture_command",
+    lambda a: {"command": a["command"], "context": a["context"]},
+)
+async def _h_capture_command(langfuse_client, memory, capture, arguments):
+    # Capture command pattern
+    memory_id = await capture.capture_command_pattern(
+        command=arguments["command"],
+        context=arguments["context"],
+        success=arguments["success"],
+        output=arguments.get("output"),
+    )
+
+    return {
+        "status": "success",
+        "memory_id": memory_id,
+        "message": f"Captured command pattern: {memory_id}",
+    }
+
+
+@_cached_tool()
+@_limited("expensive")
+@_traced_tool("graphiti_evolution", lambda a: {"topic": a["topic"]})
+async def _h_get_memory_evolution(langfuse_client, memory, capture, arguments):
+    # Get evolution history
+    evolution = await memory.get_memory_evolution(arguments["topic"])
+
+    return {
+        "status": "success",
+        "evolution": evolution,
+        "chains": len(evolution),
+    }
+
+
+@_traced_tool(
+    "graphiti_generate_commands", lambda a: {"operation": "command_generation"}
+)
+async def _h_generate_commands(langfuse_client, memory, capture, arguments):
+    # Generate Claude commands
+    generator = _generator or await get_command_generator()
+    await generator.generate_all_commands()
+
+    return {
+        "status": "success",
+        "message": f"Generated commands in ~/.claude/commands/",
+        "commands": _GENERATED_COMMANDS,
+    }
+
+
+# Read-only memory tools that multi_query may fan out to
+_MULTI_QUERY_TOOLS = frozenset(
+    {"search_memory", "find_cross_insights", "get_gtd_context", "get_memory_evolution"}
+)
+
+
+async def _h_multi_query(langfuse_client, memory, capture, arguments):
+    queries = arguments["queries"]
+    schemas = {tool.name: tool.inputSchema for tool in await list_tools()}
+    labels = set()
+    for query in queries:
+        if query["tool"] not in _MULTI_QUERY_TOOLS:
+            raise ValueError(f"multi_query does not support tool: {query['tool']}")
+        if query["label"] in labels:
+            raise ValueError(f"multi_query label used twice: {query['label']}")
+        labels.add(query["label"])
+        missing = [
+            field
+            for field in schemas[query["tool"]].get("required", ())
+            if field not in query.get("arguments", {})
+        ]
+        if missing:
+            raise ValueError(
+                f"multi_query {query['label']!r} ({query['tool']}) is missing "
+                f"required arguments: {', '.join(missing)}"
+            )
+
+    # Sub-queries run concurrently under this call's root span; one failing
+    # query is reported in its slot instead of failing the batch
+    results = await asyncio.gather(
+        *(
+            _TOOL_HANDLERS[query["tool"]](
+                langfuse_client, memory, capture, query.get("arguments", {})
+            )
+            for query in queries
+        ),
+        return_exceptions=True,
+    )
+
+    return {
+        "status": "success",
+        "results": {
+            query["label"]: (
+                {"status": "error", "error": str(result)}
+                if isinstance(result, Exception)
+                else result
+            )
+            for query, result in zip(queries, results)
+        },
+    }
+
+
+# Langfuse Trace Analysis Tools
+@_traced_tool(
+    "langfuse_analyze_traces", lambda a: {"hours_back": a.get("hours_back", 1)}
+)
+async def _h_analyze_langfuse_traces(langfuse_client, memory, capture, arguments):
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    return await analyzer.analyze_recent_traces(
+        hours_back=arguments.get("hours_back", 1),
+        session_id=arguments.get("session_id"),
+        project=arguments.get("project"),
+        limit=arguments.get("limit", 50),
+        page=arguments.get("page", 1),
+    )
+
+
+@_traced_tool("langfuse_phase_transitions", lambda a: {"trace_id": a.get("trace_id")})
+async def _h_analyze_phase_transitions(langfuse_client, memory, capture, arguments):
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    trace_id = arguments.get("trace_id")
+    session_id = arguments.get("session_id")
+    return await _cached_result(
+        ("analyze_phase_transitions", trace_id, session_id),
+        lambda: analyzer.analyze_phase_transitions(
+            trace_id=trace_id, session_id=session_id
+        ),
+    )
+
+
+@_traced_tool("langfuse_state_continuity", lambda a: {"trace_id": a.get("trace_id")})
+async def _h_validate_state_continuity(langfuse_client, memory, capture, arguments):
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    trace_id = arguments.get("trace_id")
+    session_id = arguments.get("session_id")
+    return await _cached_result(
+        ("validate_state_continuity", trace_id, session_id),
+        lambda: analyzer.validate_state_continuity(
+            trace_id=trace_id, session_id=session_id
+        ),
+    )
+
+
+@_traced_tool("langfuse_test_failure", lambda a: {"session_id": a["session_id"]})
+async def _h_analyze_test_failure(langfuse_client, memory, capture, arguments):
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    return await analyzer.analyze_test_failure(
+        session_id=arguments["session_id"],
+        return_patterns=arguments.get("return_patterns", True),
+    )
+
+
+@_traced_tool(
+    "langfuse_interrupt_patterns", lambda a: {"hours_back": a.get("hours_back", 1)}
+)
+async def _h_detect_interrupt_patterns(langfuse_client, memory, capture, arguments):
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    return await analyzer.detect_interrupt_patterns(
+        hours_back=arguments.get("hours_back", 1),
+        session_id=arguments.get("session_id"),
+        limit=arguments.get("limit", 50),
+        page=arguments.get("page", 1),
+    )
+
+
+@_traced_tool("langfuse_predict_issues", lambda a: {"trace_id": a["trace_id"]})
+async def _h_predict_trace_issues(langfuse_client, memory, capture, arguments):
+    analyzer = _langfuse_analyzer or await get_langfuse_analyzer()
+    trace_id = arguments["trace_id"]
+    threshold = arguments.get("threshold", 0.7)
+    return await _cached_result(
+        ("predict_trace_issues", trace_id, threshold),
+        lambda: analyzer.predict_trace_issues(trace_id=trace_id, threshold=threshold),
+    )
+
+
+@_traced_tool("langfuse_debug_session", lambda a: {"session_id": a["session_id"]})
+async def _h_debug_langfuse_session(langfuse_client, memory, capture, arguments):
+    if _langfuse_analyzer is None:
+        # Loading the analyzer module is what resolves _debug_session
+        await get_langfuse_analyzer()
+    if _debug_session is None:
+        return _DEBUG_SESSION_UNAVAILABLE
+    return await asyncio.get_running_loop().run_in_executor(
+        _LANGFUSE_EXECUTOR,
+        _debug_session,
+        arguments["session_id"],
+        arguments.get("focus", "all"),
+    )
+
+
+async def _h_monitor_active_traces(langfuse_client, memory, capture, arguments):
+    # Only starts/inspects a background task - no span worth recording
+    return _start_trace_monitor(
+        arguments.get("project", "all"), arguments.get("interval_seconds", 30)
+    )
+
+
+async def _h_stop_trace_monitor(langfuse_client, memory, capture, arguments):
+    return await _stop_trace_monitors(arguments.get("project"))
+
+
+# Tool name -> handler registry used by call_tool
+_TOOL_HANDLERS = {
+    "capture_solution": _h_capture_solution,
+    "capture_tdd_pattern": _h_capture_tdd_pattern,
+    "search_memory": _h_search_memory,
+    "find_cross_insights": _h_find_cross_insights,
+    "get_gtd_context": _h_get_gtd_context,
+    "supersede_memory": _h_supersede_memory,
+    "capture_command": _h_capture_command,
+    "get_memory_evolution": _h_get_memory_evolution,
+    "multi_query": _h_multi_query,
+    "generate_commands": _h_generate_commands,
+    "analyze_langfuse_traces": _h_analyze_langfuse_traces,
+    "analyze_phase_transitions": _h_analyze_phase_transitions,
+    "validate_state_continuity": _h_validate_state_continuity,
+    "analyze_test_failure": _h_analyze_test_failure,
+    "detect_interrupt_patterns": _h_detect_interrupt_patterns,
+    "predict_trace_issues": _h_predict_trace_issues,
+    "debug_langfuse_session": _h_debug_langfuse_session,
+    "monitor_active_traces": _h_monitor_active_traces,
+    "stop_trace_monitor": _h_stop_trace_monitor,
+}
+
+# Memory writes are always traced; cheap context reads and monitor bookkeeping
+# never are. Everything else is head-sampled at MCP_TRACE_SAMPLE_RATE.
+_TRACE_ALWAYS = _MEMORY_WRITES
+_TRACE_NEVER = frozenset(
+    {"get_gtd_context", "monitor_active_traces", "stop_trace_monitor"}
+)
+
+
+def _should_trace(name: str, sample_rate: float) -> bool:
+    """Decide whether a tool call gets a Langfuse trace"""
+    if name in _TRACE_ALWAYS:
+        return True
+    if name in _TRACE_NEVER:
+        return False
+    return sample_rate >= 1.0 or random.random() < sample_rate
+
+
+# Tool-call root spans currently open, and calls that ran untraced because
+# MCP_SPAN_CONCURRENCY spans were already open (exporter backpressure)
+_open_spans = 0
+_dropped_spans = 0
+# Shed spans are logged at most once per interval, with the running total
+_DROPPED_SPANS_LOG_INTERVAL = 60.0
+_dropped_spans_logged_at: Optional[float] = None
+
+
+def _shed_span(limit: int) -> None:
+    """Count a tool call run untraced for backpressure, warning now and then"""
+    global _dropped_spans, _dropped_spans_logged_at
+    _dropped_spans += 1
+    now = time.monotonic()
+    if (
+        _dropped_spans_logged_at is None
+        or now - _dropped_spans_logged_at >= _DROPPED_SPANS_LOG_INTERVAL
+    ):
+        _dropped_spans_logged_at = now
+        logger.warning(
+            "Span limit reached (MCP_SPAN_CONCURRENCY=%d), tool calls running "
+            "untraced; %d spans shed so far",
+            limit,
+            _dropped_spans,
+        )
+
+
+@contextmanager
+def _span_slot():
+    """Count a root span as open for the duration of the block"""
+    global _open_spans
+    _open_spans += 1
+    try:
+        yield
+    finally:
+        _open_spans -= 1
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool result the way the MCP SDK does (2-space indented JSON)"""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+
+def _dumps_compact(obj: Any) -> str:
+    """Serialize a resource body as compact JSON (no indentation or spaces)"""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+# Resource bodies with more items than this are encoded on a worker thread so
+# a large trace dump doesn't stall other requests on the loop
+_OFFLOAD_ENCODE_ITEMS = 50
+
+
+async def _dumps_resource(payload: Dict[str, Any], items: int) -> str:
+    """Compact-encode a resource body, off the loop when it is large"""
+    if items > _OFFLOAD_ENCODE_ITEMS:
+        return await asyncio.to_thread(_dumps_compact, payload)
+    return _dumps_compact(payload)
 
 
 @server.call_tool()
+async def _serve_tool(name: str, arguments: Dict[str, Any]) -> Any:
+    """Run a tool and pre-encode its result for the stdio transport"""
+    result = await call_tool(name, arguments)
+    if isinstance(result, dict):
+        # Hand the SDK both forms so it skips its own json.dumps of the result
+        return [TextContent(type="text", text=_dumps(result))], result
+    return result
+
+
 async def call_tool(name: str, arguments: Dict[str, Any]) -> Any:
     """Execute a memory tool"""
+    # Reject unknown tools before any client, span or component work
+    if name not in _TOOL_HANDLERS:
+        raise ValueError(f"Unknown tool: {name}")
+
     # Tag this operation as MCP-internal if Langfuse is available
-    try:
-        langfuse_client = await get_langfuse_client()
-    except Exception:
-        langfuse_client = None
+    config = _get_config()
+    langfuse_client = None
+    if (
+        config.tracing_enabled
+        and _langfuse_reachable
+        and _should_trace(name, config.trace_sample_rate)
+    ):
+        # Read the initialized client directly; only the first call awaits
+        langfuse_client = _langfuse_client
+        if langfuse_client is None:
+            try:
+                langfuse_client = await get_langfuse_client()
+            except Exception:
+                langfuse_client = None
+
+        # Shed the span rather than let tool calls pile up behind the exporter
+        if langfuse_client and _open_spans >= config.span_concurrency:
+            _shed_span(config.span_concurrency)
+            langfuse_client = None
 
     if langfuse_client:
         # Create a trace with MCP tags to prevent analysis loops using v3 patterns
-        with langfuse_client.start_as_current_span(
-            name=f"mcp_tool_{name}"
-        ) as root_span:
-            # Set trace-level tags and metadata
-            root_span.update_trace(
-                tags=[
-                    os.getenv("MCP_TRACE_TAG"),
-                    os.getenv("MCP_ANALYZER_TAG"),
-                    f"tool:{name}",
-                ],
-                metadata={
-                    "source": os.getenv("MCP_SOURCE_IDENTIFIER"),
-                    "component": "tool-handler",
-                    "tool": name,
-                    "version": os.getenv("MCP_COMPONENT_VERSION"),
-                    "arguments": arguments,
-                },
-            )
-            try:
-                memory = await get_shared_memory()
-                capture = await get_pattern_capture()
-
-                result = None
-
-                # Tool-specific logic with Graphiti spans
-                if name == "capture_solution":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_capture_solution",
-                        metadata={
-                            "error": (
-                                arguments.get("error", "")[:100]
-                                if "error" in arguments
-                                else None
-                            )
-                        },
-                    ):
-                        # Capture deployment/coding solution
-                        memory_id = await capture.capture_deployment_solution(
-                            error=arguments["error"],
-                            solution=arguments["solution"],
-                            context=arguments.get("context", {}),
-                        )
-
-                        # Link to GTD if provided
-                        if arguments.get("gtd_task_id"):
-                            await memory.link_to_gtd_task(
-                                memory_id, arguments["gtd_task_id"]
-                            )
-
-                    result = {
-                        "status": "success",
-                        "memory_id": memory_id,
-                        "message": f"Captured solution: {memory_id}",
-                    }
-
-                elif name == "capture_tdd_pattern":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_capture_tdd",
-                        metadata={"feature": arguments["feature_name"]},
-                    ):
-                        # Capture TDD pattern
-                        memory_id = await capture.capture_tdd_cycle(
-                            test_code=arguments["test_code"],
-                            implementation=arguments.get("implementation"),
-                            refactored=arguments.get("refactored"),
-                            feature_name=arguments["feature_name"],
-                        )
-
-                    result = {
-                        "status": "success",
-                        "memory_id": memory_id,
-                        "message": f"Captured TDD pattern for {arguments['feature_name']}",
-                    }
-
-                elif name == "search_memory":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_search", metadata={"query": arguments["query"]}
-                    ):
-                        # Search shared knowledge
-                        results = await memory.search_with_temporal_weight(
-                            query=arguments["query"],
-                            include_historical=arguments.get(
-                                "include_historical", False
-                            ),
-                            filter_source=arguments.get("filter_source"),
-                        )
-
-                    result = {
-                        "status": "success",
-                        "count": len(results),
-                        "results": [_format_memory(r) for r in results],
-                    }
-
-                elif name == "find_cross_insights":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_cross_insights",
-                        metadata={"topic": arguments["topic"]},
-                    ):
-                        # Find cross-domain insights
-                        insights = await memory.find_cross_domain_insights(
-                            arguments["topic"]
-                        )
-
-                    result = {
-                        "status": "success",
-                        "insights": insights,
-                        "message": f"Found {len(insights)} cross-domain insights",
-                    }
-
-                elif name == "get_gtd_context":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_gtd_context",
-                        metadata={"operation": "multi_search"},
-                    ):
-                        # Multi-search for GTD context
-                        tasks = await memory.search_with_temporal_weight(
-                            "@computer task", filter_source="gtd_coach"
-                        )
-                        projects = await memory.search_with_temporal_weight(
-                            "project active", filter_source="gtd_coach"
-                        )
-                        reviews = await memory.search_with_temporal_weight(
-                            "review insight", filter_source="gtd_coach"
-                        )
-
-                    result = {
-                        "status": "success",
-                        "context": {
-                            "active_tasks": [_format_memory(t) for t in tasks[:5]],
-                            "active_projects": [
-                                _format_memory(p) for p in projects[:3]
-                            ],
-                            "recent_insights": [_format_memory(r) for r in reviews[:3]],
-                        },
-                    }
-
-                elif name == "supersede_memory":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_supersede",
-                        metadata={
-                            "old_id": arguments["old_id"],
-                            "reason": arguments["reason"],
-                        },
-                    ):
-                        # Supersede old memory
-                        new_id = await memory.supersede_memory(
-                            old_id=arguments["old_id"],
-                            new_content=arguments["new_content"],
-                            reason=arguments["reason"],
-                        )
-
-                    result = {
-                        "status": "success",
-                        "new_id": new_id,
-                        "message": f"Superseded {arguments['old_id']} with {new_id}",
-                    }
-
-                elif name == "capture_command":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_capture_command",
-                        metadata={
-                            "command": arguments["command"],
-                            "context": arguments["context"],
-                        },
-                    ):
-                        # Capture command pattern
-                        memory_id = await capture.capture_command_pattern(
-                            command=arguments["command"],
-                            context=arguments["context"],
-                            success=arguments["success"],
-                            output=arguments.get("output"),
-                        )
-
-                    result = {
-                        "status": "success",
-                        "memory_id": memory_id,
-                        "message": f"Captured command pattern: {memory_id}",
-                    }
-
-                elif name == "get_memory_evolution":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_evolution",
-                        metadata={"topic": arguments["topic"]},
-                    ):
-                        # Get evolution history
-                        evolution = await memory.get_memory_evolution(
-                            arguments["topic"]
-                        )
-
-                    result = {
-                        "status": "success",
-                        "evolution": evolution,
-                        "chains": len(evolution),
-                    }
-
-                elif name == "generate_commands":
-                    # Create sub-span for Graphiti operation
-                    with langfuse_client.start_as_current_span(
-                        name="graphiti_generate_commands",
-                        metadata={"operation": "command_generation"},
-                    ):
-                        # Generate Claude commands
-                        generator = await get_command_generator()
-                        await generator.generate_all_commands()
-
-                    result = {
-                        "status": "success",
-                        "message": f"Generated commands in ~/.claude/commands/",
-                        "commands": [
-                            "/tdd-feature",
-                            "/check-deployment",
-                            "/fix-docker",
-                            "/project-structure",
-                            "/search-memory",
-                        ],
-                    }
-
-                # Langfuse Trace Analysis Tools
-                elif name == "analyze_langfuse_traces":
-                    with langfuse_client.start_as_current_span(
-                        name="langfuse_analyze_traces",
-                        metadata={"hours_back": arguments.get("hours_back", 1)},
-                    ):
-                        analyzer = await get_langfuse_analyzer()
-                        result = await analyzer.analyze_recent_traces(
-                            hours_back=arguments.get("hours_back", 1),
-                            session_id=arguments.get("session_id"),
-                            project=arguments.get("project"),
-                        )
-
-                elif name == "analyze_phase_transitions":
-                    with langfuse_client.start_as_current_span(
-                        name="langfuse_phase_transitions",
-                        metadata={"trace_id": arguments.get("trace_id")},
-                    ):
-                        analyzer = await get_langfuse_analyzer()
-                        result = await analyzer.analyze_phase_transitions(
-                            trace_id=arguments.get("trace_id"),
-                            session_id=arguments.get("session_id"),
-                        )
-
-                elif name == "validate_state_continuity":
-                    with langfuse_client.start_as_current_span(
-                        name="langfuse_state_continuity",
-                        metadata={"trace_id": arguments.get("trace_id")},
-                    ):
-                        analyzer = await get_langfuse_analyzer()
-                        result = await analyzer.validate_state_continuity(
-                            trace_id=arguments.get("trace_id"),
-                            session_id=arguments.get("session_id"),
-                        )
-
-                elif name == "analyze_test_failure":
-                    with langfuse_client.start_as_current_span(
-                        name="langfuse_test_failure",
-                        metadata={"session_id": arguments["session_id"]},
-                    ):
-                        analyzer = await get_langfuse_analyzer()
-                        result = await analyzer.analyze_test_failure(
-                            session_id=arguments["session_id"],
-                            return_patterns=arguments.get("return_patterns", True),
-                        )
-
-                elif name == "detect_interrupt_patterns":
-                    with langfuse_client.start_as_current_span(
-                        name="langfuse_interrupt_patterns",
-                        metadata={"hours_back": arguments.get("hours_back", 1)},
-                    ):
-                        analyzer = await get_langfuse_analyzer()
-                        result = await analyzer.detect_interrupt_patterns(
-                            hours_back=arguments.get("hours_back", 1),
-                            session_id=arguments.get("session_id"),
-                        )
-
-                elif name == "predict_trace_issues":
-                    with langfuse_client.start_as_current_span(
-                        name="langfuse_predict_issues",
-                        metadata={"trace_id": arguments["trace_id"]},
-                    ):
-                        analyzer = await get_langfuse_analyzer()
-                        result = await analyzer.predict_trace_issues(
-                            trace_id=arguments["trace_id"],
-                            threshold=arguments.get("threshold", 0.7),
-                        )
-
-                elif name == "debug_langfuse_session":
-                    with langfuse_client.start_as_current_span(
-                        name="langfuse_debug_session",
-                        metadata={"session_id": arguments["session_id"]},
-                    ):
-                        analyzer = await get_langfuse_analyzer()
-                        try:
-                            from langfuse_integration.analyze_langfuse_traces import (
-                                debug_session,
-                            )
-
-                            loop = asyncio.get_event_loop()
-                            result = await loop.run_in_executor(
-                                None,
-                                debug_session,
-                                arguments["session_id"],
-                                arguments.get("focus", "all"),
-                            )
-                        except ImportError:
-                            result = {
-                                "status": "error",
-                                "message": "debug_session not available - analyze_langfuse_traces module not found",
-                            }
-
-                elif name == "monitor_active_traces":
-                    with langfuse_client.start_as_current_span(
-                        name="langfuse_monitor_traces",
-                        metadata={"interval": arguments.get("interval_seconds", 30)},
-                    ):
-                        analyzer = await get_langfuse_analyzer()
-                        result = {
-                            "status": "success",
-                            "message": "Real-time monitoring would check traces every {} seconds".format(
-                                arguments.get("interval_seconds", 30)
-                            ),
-                            "project": arguments.get("project", "all"),
-                            "note": "Full real-time monitoring requires a background task",
-                        }
+        # The root span is ended by the trace worker, not on context exit
+        with _span_slot():
+            with langfuse_client.start_as_current_span(
+                name=f"mcp_tool_{name}", end_on_exit=False
+            ) as root_span:
+                # Trace-level tags and metadata, sent with the terminal update
+                trace_attrs = {
+                    "tags": [*config.trace_tags, f"tool:{name}"],
+                    "metadata": {
+                        "source": config.source_identifier,
+                        "component": "tool-handler",
+                        "tool": name,
+                        "version": config.component_version,
+                        "arguments": _redact_and_truncate(arguments),
+                    },
+                }
+                try:
+                    result = await _run_tool(name, langfuse_client, arguments)
+
+                    # Update trace with result
+                    _enqueue_trace_update(
+                        root_span, {"status": "success", "result": result}, trace_attrs
+                    )
+                    return result
+
+                except Exception as e:
+                    _enqueue_trace_update(
+                        root_span, {"status": "error", "error": str(e)}, trace_attrs
+                    )
+                    logger.error("Tool %s failed: %s", name, e)
+                    raise
+    else:
+        # Fallback when Langfuse is not available or tracing is disabled
+        return await _run_tool(name, _NOOP_LANGFUSE, arguments)
 
-                else:
-                    raise ValueError(f"Unknown tool: {name}")
 
-                # Update trace with result
-                root_span.update_trace(output={"status": "success", "result": result})
-                return result
+class _NoopLangfuse:
+    """Client stand-in for untraced calls - handler sub-spans become no-ops"""
 
-            except Exception as e:
-                root_span.update_trace(output={"status": "error", "error": str(e)})
-                logger.error(f"Tool {name} failed: {e}")
-                raise
-    else:
-        # Fallback when Langfuse is not available
-        return await _execute_tool_without_tracing(name, arguments)
+    __slots__ = ()
 
+    @staticmethod
+    def start_as_current_span(*args, **kwargs):
+        return nullcontext()
 
-async def _execute_tool_without_tracing(name: str, arguments: Dict[str, Any]) -> Any:
-    """Execute tool without Langfuse tracing (fallback mode)"""
-    memory = await get_shared_memory()
-    capture = await get_pattern_capture()
 
-    if name == "capture_solution":
-        memory_id = await capture.capture_deployment_solution(
-            error=arguments["error"],
-            solution=arguments["solution"],
-            context=arguments.get("context", {}),
-        )
-        if arguments.get("gtd_task_id"):
-            await memory.link_to_gtd_task(memory_id, arguments["gtd_task_id"])
-        return {
-            "status": "success",
-            "memory_id": memory_id,
-            "message": f"Captured solution: {memory_id}",
-        }
+_NOOP_LANGFUSE = _NoopLangfuse()
 
-    elif name == "capture_tdd_pattern":
-        memory_id = await capture.capture_tdd_cycle(
-            test_code=arguments["test_code"],
-            implementation=arguments.get("implementation"),
-            refactored=arguments.get("refactored"),
-            feature_name=arguments["feature_name"],
-        )
-        return {
-            "status": "success",
-            "memory_id": memory_id,
-            "message": f"Captured TDD pattern for {arguments['feature_name']}",
-        }
 
-    elif name == "search_memory":
-        results = await memory.search_with_temporal_weight(
-            query=arguments["query"],
-            filter_source=arguments.get("filter_source"),
-            include_historical=arguments.get("include_historical", False),
-        )
-        return {"memories": [_format_memory(m) for m in results], "count": len(results)}
+async def _run_tool(name: str, langfuse_client: Any, arguments: Dict[str, Any]) -> Any:
+    """Dispatch a tool to its handler - the one path for traced and untraced calls
 
-    elif name == "find_cross_insights":
-        insights = await memory.find_cross_domain_insights(arguments["topic"])
-        return {
-            "insights": [_format_memory(i) for i in insights],
-            "count": len(insights),
-        }
+    Untraced calls pass _NOOP_LANGFUSE, so handler sub-spans become no-ops and
+    results don't depend on whether the call was sampled.
+    """
+    handler = _TOOL_HANDLERS[name]
+    cache_key = getattr(handler, "cache_key", None)
+    if cache_key is not None:
+        # A fresh cache hit does no backend work, so it takes no "tool" slot
+        hit = _fresh_result(cache_key(arguments))
+        if hit is not None:
+            return hit[1]
 
-    elif name == "get_gtd_context":
-        now_results = await memory.search_with_temporal_weight(
-            "@computer tasks next actions", filter_source="gtd_coach"
-        )
-        project_results = await memory.search_with_temporal_weight(
-            "project planning", filter_source="gtd_coach"
-        )
-        recent_activity = await memory.search_with_temporal_weight(
-            "today done completed", filter_source="gtd_coach"
-        )
-        return {
-            "now_actions": [_format_memory(m) for m in now_results],
-            "active_projects": [_format_memory(m) for m in project_results],
-            "recent_activity": [_format_memory(m) for m in recent_activity],
-        }
+    memory = _memory or await get_shared_memory()
+    capture = _capture or await get_pattern_capture()
+    async with _tool_semaphore("tool"):
+        result = await handler(langfuse_client, memory, capture, arguments)
+    if name in _MEMORY_WRITES:
+        _drop_cached_reads()
+    return result
 
-    elif name == "supersede_memory":
-        new_id = await memory.supersede_memory(
-            old_id=arguments["old_id"],
-            new_content=arguments["new_content"],
-            reason=arguments["reason"],
-        )
-        return {
-            "status": "success",
-            "new_memory_id": new_id,
-            "old_memory_id": arguments["old_id"],
-        }
 
-    elif name == "capture_command":
-        result = await capture.capture_command_pattern(
-            command=arguments["command"],
-            context=arguments["context"],
-            success=arguments["success"],
-            output=arguments.get("output"),
-        )
-        return result
-
-    elif name == "get_memory_evolution":
-        evolution = await memory.get_memory_evolution(arguments["topic"])
-        return {"evolution": evolution, "count": len(evolution)}
-
-    elif name == "generate_commands":
-        generator = await get_command_generator()
-        commands = await generator.generate_all_commands()
-        return {"commands": commands, "count": len(commands)}
-
-    # Langfuse Analysis Tools
-    elif name == "analyze_langfuse_traces":
-        analyzer = await get_langfuse_analyzer()
-        return await analyzer.analyze_recent_traces(
-            hours_back=arguments.get("hours_back", 1),
-            session_id=arguments.get("session_id"),
-            project=arguments.get("project"),
-        )
+class _PreviewLimitReachedError(Exception):
+    """Raised by _BoundedWriter once the preview has enough characters"""
 
-    elif name == "analyze_phase_transitions":
-        analyzer = await get_langfuse_analyzer()
-        return await analyzer.analyze_phase_transitions(
-            trace_id=arguments.get("trace_id"),
-            session_id=arguments.get("session_id"),
-        )
 
-    elif name == "validate_state_continuity":
-        analyzer = await get_langfuse_analyzer()
-        return await analyzer.validate_state_continuity(
-            trace_id=arguments.get("trace_id"),
-            session_id=arguments.get("session_id"),
-        )
+class _BoundedWriter(io.StringIO):
+    """StringIO that stops json.dump once `limit` characters are written"""
 
-    elif name == "analyze_test_failure":
-        analyzer = await get_langfuse_analyzer()
-        return await analyzer.analyze_test_failure(
-            session_id=arguments["session_id"],
-            return_patterns=arguments.get("return_patterns", True),
-        )
+    def __init__(self, limit: int):
+        super().__init__()
+        self._limit = limit
 
-    elif name == "detect_interrupt_patterns":
-        analyzer = await get_langfuse_analyzer()
-        return await analyzer.detect_interrupt_patterns(
-            hours_back=arguments.get("hours_back", 1),
-            session_id=arguments.get("session_id"),
-        )
+    def write(self, s: str) -> int:
+        written = super().write(s)
+        if self.tell() > self._limit:
+            raise _PreviewLimitReachedError
+        return written
 
-    elif name == "predict_trace_issues":
-        analyzer = await get_langfuse_analyzer()
-        return await analyzer.predict_trace_issues(
-            trace_id=arguments["trace_id"],
-            threshold=arguments.get("threshold", 0.7),
-        )
 
-    elif name == "debug_langfuse_session":
-        analyzer = await get_langfuse_analyzer()
-        try:
-            from langfuse_integration.analyze_langfuse_traces import debug_session
-
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                None,
-                debug_session,
-                arguments["session_id"],
-                arguments.get("focus", "all"),
-            )
-        except ImportError:
-            return {
-                "status": "error",
-                "message": "debug_session not available - analyze_langfuse_traces module not found",
-            }
+def _bounded_json_preview(obj: Any, limit: int = 200) -> str:
+    """JSON preview of obj capped at `limit` characters.
 
-    elif name == "monitor_active_traces":
-        analyzer = await get_langfuse_analyzer()
-        return {
-            "status": "success",
-            "message": "Real-time monitoring would check traces every {} seconds".format(
-                arguments.get("interval_seconds", 30)
-            ),
-            "project": arguments.get("project", "all"),
-            "note": "Full real-time monitoring requires a background task",
-        }
+    json.dump streams chunks into the writer, so serialization is abandoned as
+    soon as the limit is passed instead of rendering the whole object.
+    """
+    buf = _BoundedWriter(limit)
+    try:
+        json.dump(obj, buf, default=str)
+    except _PreviewLimitReachedError:
+        return buf.getvalue()[:limit] + "..."
+    except (TypeError, ValueError):
+        # Unserializable keys or circular references - fall back to repr
+        text = str(obj)
+        return text[:limit] + "..." if len(text) > limit else text
+    return buf.getvalue()
+
+
+# API keys and bearer tokens that must not leave the process in trace metadata
+_SECRET_PATTERN = re.compile(
+    r"\b(?:sk|pk)-[A-Za-z0-9_-]{8,}|\bghp_[A-Za-z0-9]{20,}|Bearer\s+[\w.~+/-]+=*"
+)
+
+
+def _redact_and_truncate(arguments: Dict[str, Any], limit: int = 256) -> Dict[str, Any]:
+    """Trace-safe copy of tool arguments: long values cut, secrets masked"""
+    safe = {}
+    for key, value in arguments.items():
+        if value is None or isinstance(value, (bool, int, float)):
+            safe[key] = value
+            continue
+        if isinstance(value, str):
+            text = value[:limit] + "..." if len(value) > limit else value
+        else:
+            text = _bounded_json_preview(value, limit)
+        safe[key] = _SECRET_PATTERN.sub("[REDACTED]", text)
+    return safe
 
-    else:
-        raise ValueError(f"Unknown tool: {name}")
+
+# Upper bound (seconds) the memory count may add to memory://shared-knowledge
+_COUNT_MEMORIES_TIMEOUT = 0.5
+# Counts are reused for this long (seconds), keyed by group_id
+_COUNT_MEMORIES_TTL = 60.0
+_count_cache: Dict[str, tuple] = {}
+
+# Shared read-only fallback for memories without metadata
+_EMPTY_METADATA: Dict[str, Any] = {}
+
+
+def _content_preview(get, metadata: Dict[str, Any], limit: int = 200) -> str:
+    """Preview from the memory's own text field, else from its metadata JSON"""
+    content = get("content") or get("summary") or get("description")
+    if isinstance(content, str):
+        return content[:limit] + "..." if len(content) > limit else content
+    return _bounded_json_preview(metadata, limit)
+
+
+_get_id = attrgetter("id")
+_get_uuid = attrgetter("uuid")
+
+
+def _memory_id(memory: Any) -> Optional[str]:
+    """Memory id from `id`, falling back to `uuid` (Graphiti nodes/edges)"""
+    try:
+        memory_id = _get_id(memory)
+    except AttributeError:
+        memory_id = None
+    if memory_id is None:
+        try:
+            memory_id = _get_uuid(memory)
+        except AttributeError:
+            pass
+    return memory_id
 
 
 def _format_memory(memory: Any) -> Dict[str, Any]:
     """Format memory for output"""
     # Handle both dict-like metadata and object attributes
-    if hasattr(memory, "metadata"):
-        metadata = memory.metadata
-    elif isinstance(memory, dict):
-        metadata = memory
-    else:
-        metadata = {}
-
-    # Safely extract fields with fallbacks
-    memory_id = getattr(memory, "id", getattr(memory, "uuid", None))
+    metadata = getattr(memory, "metadata", None)
+    if metadata is None:
+        metadata = memory if isinstance(memory, dict) else _EMPTY_METADATA
 
     # Handle score - it might be 'final_score', 'score', or not exist at all
-    score = getattr(memory, "final_score", getattr(memory, "score", 0))
+    score = getattr(memory, "final_score", None)
+    if score is None:
+        score = getattr(memory, "score", 0)
+
+    get = metadata.get
+    status = getattr(memory, "status", None)
+    if status is None:
+        status = get("status", "unknown")
 
     return {
-        "id": memory_id,
-        "title": metadata.get("title", "Untitled"),
-        "source": metadata.get("source", "unknown"),
-        "status": getattr(memory, "status", metadata.get("status", "unknown")),
+        "id": _memory_id(memory),
+        "title": get("title", "Untitled"),
+        "source": get("source", "unknown"),
+        "status": status,
         "score": score,
-        "timestamp": metadata.get("timestamp", None),
-        "cross_references": metadata.get("cross_references", []),
-        "content_preview": (
-            str(metadata)[:200] + "..." if len(str(metadata)) > 200 else str(metadata)
-        ),
+        "timestamp": get("timestamp", None),
+        "cross_references": get("cross_references", []),
+        "content_preview": _content_preview(get, metadata),
     }
 
 
-async def _count_memories(memory) -> int:
-    """Estimate total memories in group"""
+def _format_memories(
+    memories: Iterable[Any], limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Format up to `limit` memories without slicing the result list first"""
+    return list(map(_format_memory, islice(memories, limit)))
+
+
+async def _count_memories(memory) -> Optional[int]:
+    """Count total memories in group (None if the count failed or timed out)"""
+    group_id = memory.group_id
+    cached = _count_cache.get(group_id)
+    if cached is not None and time.monotonic() - cached[0] < _COUNT_MEMORIES_TTL:
+        return cached[1]
+
     try:
-        # Do a broad search to estimate count
-        results = await memory.search_with_temporal_weight(
-            "*", include_historical=True  # Broad search
+        # Server-side count - avoids materializing every memory just for len()
+        total = await asyncio.wait_for(
+            memory.count_memories(), timeout=_COUNT_MEMORIES_TIMEOUT
         )
-        return len(results)
-    except:
-        return 0
+    except asyncio.TimeoutError:
+        logger.warning("Memory count timed out")
+        return None
+    except (ConnectionError, DriverError, Neo4jError, GraphitiError) as e:
+        logger.warning("Memory count unavailable: %s", e)
+        return None
+
+    _count_cache[group_id] = (time.monotonic(), total)
+    return total
 
 
 async def main():
@@ -1333,7 +2274,8 @@ async def main():
         health = await secrets_manager.health_check()
         if health.get("secrets_accessible"):
             logger.info(
-                f"✅ 1Password SDK initialized (token expires in {health['token_days_left']} days)"
+                "✅ 1Password SDK initialized (token expires in %s days)",
+                health["token_days_left"],
             )
         else:
             logger.warning("⚠️ Running in fallback mode with .env.graphiti")
@@ -1351,10 +2293,10 @@ async def main():
                 secrets_manager = await SecretsManager.get_instance()
                 logger.info("✅ Running in fallback mode with .env.graphiti")
             except Exception as fallback_e:
-                logger.error(f"❌ Fallback also failed: {fallback_e}")
+                logger.error("❌ Fallback also failed: %s", fallback_e)
                 raise SystemExit(f"Cannot start MCP server: {fallback_e}")
         else:
-            logger.error(f"❌ Failed to initialize secrets: {e}")
+            logger.error("❌ Failed to initialize secrets: %s", e)
             # Try fallback as last resort
             logger.info("Attempting fallback mode...")
             os.environ["GRAPHITI_FALLBACK_MODE"] = "true"
@@ -1367,7 +2309,10 @@ async def main():
                     f"Cannot start MCP server without secrets: {fallback_e}"
                 )
 
-    logger.info(f"Shared group_id: {os.getenv('GRAPHITI_GROUP_ID')}")
+    # Snapshot the environment now that .env.graphiti and secrets are loaded
+    global _config
+    _config = ServerConfig.from_env()
+    logger.info("Shared group_id: %s", _config.group_id)
 
     # Initialize Langfuse client now that secrets are loaded
     try:
@@ -1376,35 +2321,53 @@ async def main():
         LANGFUSE_ENABLED = True
         logger.info("✅ Langfuse client initialized successfully")
     except Exception as e:
-        logger.error(f"❌ Failed to initialize Langfuse: {e}")
+        logger.error("❌ Failed to initialize Langfuse: %s", e)
         raise SystemExit(f"Cannot start MCP server without Langfuse: {e}")
 
-    # Initialize components (they can now access secrets from environment)
-    memory = await get_shared_memory()
-    capture = await get_pattern_capture()
-    generator = await get_command_generator()
+    # Initialize components (they can now access secrets from environment).
+    # The Langfuse probe and the Neo4j-backed memory are independent network
+    # round-trips, so they overlap; the rest just wrap the shared memory.
+    global _memory, _capture, _generator
+    _, _memory = await asyncio.gather(_check_langfuse_reachable(), get_shared_memory())
+    _capture = await get_pattern_capture()
+    _generator = await get_command_generator()
+    await get_langfuse_analyzer()
 
     logger.info("✅ All components initialized")
     logger.info("MCP Server ready for connections")
 
+    # Run new tasks eagerly up to their first real suspension point, so
+    # handlers that complete without blocking skip a loop round-trip.
+    # eager_task_factory only exists on Python 3.12+; on older interpreters,
+    # including the python:3.11 Docker image, this is a no-op.
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
+    _start_trace_worker()
+
     # Run server with stdio transport and instructions
-    import mcp.server.stdio
-    from mcp.server import NotificationOptions
-
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="graphiti-claude-code-mcp",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="graphiti-claude-code-mcp",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
+                    instructions=INSTRUCTIONS,
                 ),
-                instructions=INSTRUCTIONS,
-            ),
-        )
+            )
+    finally:
+        if _langfuse_reprobe_task is not None:
+            _langfuse_reprobe_task.cancel()
+        await _stop_trace_monitors()
+        await _stop_trace_worker()
+        # Drain the span batch processor while the loop is still up
+        await asyncio.to_thread(langfuse_client.flush)
 
 
 if __name__ == "__main__":
@@ -1413,5 +2376,17 @@ if __name__ == "__main__":
     # Load configuration
     load_dotenv(".env.graphiti")
 
+    # Prefer uvloop when available - lower per-callback overhead for the
+    # Graphiti/Langfuse I/O fan-outs. uvloop.run() builds the loop directly
+    # instead of going through the deprecated event loop policy API.
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
     # Run server
-    asyncio.run(main())
+    if uvloop is not None:
+        logger.info("Using uvloop event loop")
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
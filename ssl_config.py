@@ -46,12 +46,14 @@ class SSLConfig:
         self._ssl_context: Optional[ssl.SSLContext] = None
         self._cert_path: Optional[str] = None
         self._environment: Optional[str] = None
+        self._orbstack = False
         self._detect_environment()
 
     def _detect_environment(self) -> None:
         """Detect the current environment and available certificates."""
-        # Check for OrbStack
-        if self._is_orbstack():
+        # Check for OrbStack (probed once - it reads /etc/hosts and stats certs)
+        self._orbstack = self._is_orbstack()
+        if self._orbstack:
             self._environment = "orbstack"
             self._cert_path = self._find_orbstack_cert()
             logger.info(f"OrbStack environment detected, using cert: {self._cert_path}")
@@ -221,7 +223,7 @@ class SSLConfig:
             "environment": self._environment,
             "cert_path": self._cert_path,
             "cert_exists": Path(self._cert_path).exists() if self._cert_path else False,
-            "is_orbstack": self._is_orbstack(),
+            "is_orbstack": self._orbstack,
             "env_vars": {
                 "SSL_CERT_FILE": os.environ.get("SSL_CERT_FILE"),
                 "SSL_CERT_DIR": os.environ.get("SSL_CERT_DIR"),
@@ -256,9 +258,14 @@ def get_ssl_config() -> SSLConfig:
     return _ssl_config
 
 
+# Shared Langfuse clients, one per timeout, so every Langfuse caller reuses
+# the same connection pool and SSL context
+_langfuse_httpx_clients: dict[float, httpx.Client] = {}
+
+
 def create_langfuse_httpx_client(timeout: float = 30.0) -> httpx.Client:
     """
-    Create httpx client specifically configured for Langfuse.
+    Get the shared httpx client configured for Langfuse.
 
     Args:
         timeout: Request timeout in seconds
@@ -266,8 +273,12 @@ def create_langfuse_httpx_client(timeout: float = 30.0) -> httpx.Client:
     Returns:
         Configured httpx.Client for Langfuse
     """
-    config = get_ssl_config()
-    return config.get_httpx_client(timeout=timeout)
+    client = _langfuse_httpx_clients.get(timeout)
+    if client is None or client.is_closed:
+        config = get_ssl_config()
+        client = config.get_httpx_client(timeout=timeout)
+        _langfuse_httpx_clients[timeout] = client
+    return client
 
 
 if __name__ == "__main__":